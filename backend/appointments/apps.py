@@ -6,4 +6,5 @@ class AppointmentsConfig(AppConfig):
     
     def ready(self):
         """Import signals when app is ready"""
-        import appointments.signals  # ✅ ADD THIS
\ No newline at end of file
+        import appointments.signals  # ✅ ADD THIS
+        import backend.checks
@@ -0,0 +1,106 @@
+# backend/appointments/management/commands/archive_past_appointments.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+# One chunk: claim up to batch_size expired rows (skipping rows another
+# node has claimed), delete them and insert them into the archive, all in
+# one statement so the row locks last only as long as the chunk.
+# Booked appointments are archived as completed, as in
+# auto_complete_past_appointments().
+ARCHIVE_CHUNK_SQL = """
+    WITH batch AS (
+        SELECT id FROM appointments_appointment
+        WHERE scheduled_time < NOW()
+          AND status <> 'cancelled'
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        DELETE FROM appointments_appointment a
+        USING batch
+        WHERE a.id = batch.id
+        RETURNING a.id, a.doctor_id, a.clinic_id, a.patient_id,
+                  a.scheduled_time, a.status, a.notes, a.created_at
+    ),
+    archived AS (
+        INSERT INTO appointments_pastappointment (
+            id, doctor_id, clinic_id, patient_id,
+            scheduled_time, status, notes, created_at, completed_at
+        )
+        SELECT
+            id, doctor_id, clinic_id, patient_id,
+            scheduled_time,
+            CASE WHEN status = 'booked' THEN 'completed' ELSE status END,
+            notes, created_at, NOW()
+        FROM moved
+        ON CONFLICT (id, scheduled_time) DO NOTHING
+        RETURNING 1
+    )
+    SELECT
+        (SELECT COUNT(*) FROM moved),
+        (SELECT COUNT(*) FROM archived)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Move expired appointments to appointments_pastappointment in bounded chunks "
+        "(safe to run on several nodes at once; use --every for a periodic loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after N chunks per sweep (0 = until nothing is left)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between chunks to leave room for other writers",
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Keep running and sweep every N seconds",
+        )
+
+    def sweep(self, batch_size, max_batches, pause):
+        moved_total = archived_total = batches = 0
+        started = time.perf_counter()
+
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(ARCHIVE_CHUNK_SQL, [batch_size])
+                moved, archived = cursor.fetchone()
+
+            batches += 1
+            moved_total += moved
+            archived_total += archived
+            if moved < batch_size or (max_batches and batches >= max_batches):
+                break
+            if pause:
+                time.sleep(pause)
+
+        elapsed = time.perf_counter() - started
+        return moved_total, archived_total, batches, elapsed
+
+    def handle(self, *args, **options):
+        while True:
+            moved, archived, batches, elapsed = self.sweep(
+                options["batch_size"], options["max_batches"], options["pause"]
+            )
+            rate = moved / elapsed if elapsed else 0
+            self.stdout.write(
+                f"Archived {moved} appointment(s) in {batches} chunk(s), {elapsed:.2f}s "
+                f"({rate:.0f} rows/s; {moved - archived} already archived)"
+            )
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
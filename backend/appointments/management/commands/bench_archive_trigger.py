@@ -0,0 +1,96 @@
+# backend/appointments/management/commands/bench_archive_trigger.py
+import importlib
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+archive_trigger = importlib.import_module("appointments.migrations.0009_statement_level_archive_trigger")
+
+MODES = {
+    "row-level": archive_trigger.ROW_TRIGGER_SQL,
+    "statement-level": archive_trigger.STATEMENT_TRIGGER_SQL,
+}
+
+# Temporary tables shadow the live ones for this session only (pg_temp comes
+# first in the search path), so the archive functions, which use unqualified
+# table names, run against the scratch copies and the live tables are never
+# locked beyond the brief ACCESS SHARE taken by LIKE. FKs and other triggers
+# are not copied, so only the archive trigger is measured.
+SCRATCH_TABLES_SQL = """
+    CREATE TEMP TABLE appointments_appointment
+        (LIKE public.appointments_appointment INCLUDING ALL EXCLUDING DEFAULTS)
+        ON COMMIT DROP;
+    CREATE TEMP TABLE appointments_pastappointment
+        (LIKE public.appointments_pastappointment INCLUDING ALL EXCLUDING DEFAULTS)
+        ON COMMIT DROP;
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark a bulk 'mark completed' UPDATE under the row-level and the "
+        "statement-level archive trigger, on session-private scratch copies of "
+        "the appointment tables (live tables and their triggers are untouched)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def run_once(self, cursor, rows, offset):
+        # Far-future slots so only the status change qualifies rows for archiving
+        cursor.execute("""
+            INSERT INTO appointments_appointment
+            (id, doctor_id, clinic_id, patient_id, scheduled_time, status, notes, created_at)
+            SELECT %s + n, 1, 1, 1,
+                   date_trunc('day', NOW()) + INTERVAL '10 years' + make_interval(mins => %s + n),
+                   'booked', '', NOW()
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """, [offset, offset, rows])
+        ids = [row[0] for row in cursor.fetchall()]
+
+        started = time.perf_counter()
+        cursor.execute("""
+            UPDATE appointments_appointment SET status = 'completed' WHERE id = ANY(%s)
+        """, [ids])
+        elapsed = time.perf_counter() - started
+
+        cursor.execute("SELECT COUNT(*) FROM appointments_appointment WHERE id = ANY(%s)", [ids])
+        if cursor.fetchone()[0]:
+            raise CommandError("Updated rows were not archived")
+        return elapsed
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        results = {}
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(SCRATCH_TABLES_SQL)
+                cursor.execute("SELECT to_regclass('appointments_appointment')::text")
+                if not cursor.fetchone()[0].startswith("pg_temp"):
+                    raise CommandError("Scratch tables do not shadow the live tables; refusing to run")
+
+                offset = 0
+                for mode, trigger_sql in MODES.items():
+                    cursor.execute("DROP TRIGGER IF EXISTS trigger_move_to_past ON pg_temp.appointments_appointment")
+                    cursor.execute(trigger_sql.replace(
+                        "ON appointments_appointment", "ON pg_temp.appointments_appointment"
+                    ))
+                    timings = []
+                    for _ in range(repeat):
+                        timings.append(self.run_once(cursor, rows, offset))
+                        offset += rows
+                    results[mode] = min(timings)
+
+            # Drops the scratch tables
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"UPDATE of {rows} appointments to 'completed', best of {repeat}")
+        for mode, seconds in results.items():
+            self.stdout.write(f"{mode:>16}: {seconds * 1000:8.2f} ms ({rows / seconds:,.0f} rows/s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"speedup: {results['row-level'] / results['statement-level']:.1f}x"
+        ))
@@ -0,0 +1,80 @@
+# backend/appointments/management/commands/cancel_clinic_day.py
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from appointments.signals import fetch_participants_many, notify_cancellation
+from appointments.slot_cache import invalidate_slots
+from doctors.next_slot import refresh_next_free_slots
+from notifications.fanout import notification_fanout
+
+
+CancelledAppointment = namedtuple(
+    "CancelledAppointment", ["id", "doctor_id", "patient_id", "clinic_id", "scheduled_time", "status"]
+)
+
+# One set-based UPDATE instead of a SELECT ... FOR UPDATE and a save() per row.
+# This bypasses post_save, so the cancellations are announced by this command.
+CANCEL_DAY_SQL = """
+    UPDATE appointments_appointment
+    SET status = 'cancelled'
+    WHERE clinic_id = %s
+      AND scheduled_time >= %s
+      AND scheduled_time < %s
+      AND status IN ('booked', 'rescheduled')
+    RETURNING id, doctor_id, patient_id, clinic_id, scheduled_time, status
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancel every upcoming appointment at a clinic on one day (e.g. the clinic is closed) "
+        "and notify doctors and patients; notifications and emails are written in bulk"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("clinic_id", type=int)
+        parser.add_argument("date", help="YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        try:
+            day = datetime.strptime(options["date"], "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD")
+
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        end = start + timedelta(days=1)
+
+        with transaction.atomic(), notification_fanout() as fanout:
+            with connection.cursor() as cursor:
+                cursor.execute(CANCEL_DAY_SQL, [
+                    options["clinic_id"], max(start, timezone.now()), end,
+                ])
+                appointments = [CancelledAppointment(*row) for row in cursor.fetchall()]
+
+            # One participants query for the whole day, then in-memory messages
+            if appointments:
+                participants = fetch_participants_many(appointments)
+                for appointment in appointments:
+                    notify_cancellation(appointment, *participants[appointment.id])
+            notifications, emails = len(fanout.notifications), len(fanout.emails)
+
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id FROM doctors_doctorclinic
+                    WHERE clinic_id = %s AND doctor_id = ANY(%s)
+                """, [options["clinic_id"], list({a.doctor_id for a in appointments})])
+                doctor_clinic_ids = [row[0] for row in cursor.fetchall()]
+
+            for doctor_clinic_id in doctor_clinic_ids:
+                invalidate_slots(doctor_clinic_id, day)
+            if doctor_clinic_ids:
+                refresh_next_free_slots(doctor_clinic_ids)
+
+        self.stdout.write(
+            f"Cancelled {len(appointments)} appointment(s); queued {notifications} notification(s) "
+            f"and {emails} email(s)"
+        )
@@ -0,0 +1,98 @@
+# backend/appointments/management/commands/manage_past_partitions.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+PARENT_TABLE = "appointments_pastappointment"
+DEFAULT_PARTITION = "appointments_pastappointment_default"
+
+
+def add_months(day, months):
+    """First day of the month `months` after (or before) day's month"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly partitions of appointments_pastappointment and "
+        "detach (or drop) partitions older than the retention window"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=3)
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=0,
+            help="Keep this many months of history, including the current one (0 = keep everything)",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop expired partitions instead of only detaching them",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def monthly_partitions(self, cursor):
+        """Return [(month, table name)] of the attached monthly partitions, oldest first"""
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            INNER JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+              AND c.relname ~ '_p[0-9]{6}$'
+            ORDER BY c.relname
+        """, [PARENT_TABLE])
+        partitions = []
+        for (name,) in cursor.fetchall():
+            stamp = name[-6:]
+            partitions.append((date(int(stamp[:4]), int(stamp[4:]), 1), name))
+        return partitions
+
+    def handle(self, *args, **options):
+        this_month = date.today().replace(day=1)
+        quote = connection.ops.quote_name
+
+        failed = 0
+        with connection.cursor() as cursor:
+            for offset in range(options["months_ahead"] + 1):
+                month = add_months(this_month, offset)
+                if options["dry_run"]:
+                    self.stdout.write(f"Would ensure partition for {month:%Y-%m}")
+                    continue
+                # One savepoint per month: a failure is reported and the rest still run
+                try:
+                    with transaction.atomic():
+                        cursor.execute("SELECT ensure_pastappointment_partition(%s)", [month])
+                        self.stdout.write(f"Partition ready: {cursor.fetchone()[0]}")
+                except DatabaseError as e:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f"Partition for {month:%Y-%m} failed: {e}"))
+
+            if options["retain_months"]:
+                cutoff = add_months(this_month, 1 - options["retain_months"])
+                for month, name in self.monthly_partitions(cursor):
+                    if month >= cutoff:
+                        continue
+                    action = "drop" if options["drop"] else "detach"
+                    if options["dry_run"]:
+                        self.stdout.write(f"Would {action} {name}")
+                        continue
+                    # Detaching is a catalog change, not a row-by-row DELETE
+                    cursor.execute(f"ALTER TABLE {quote(PARENT_TABLE)} DETACH PARTITION {quote(name)}")
+                    if options["drop"]:
+                        cursor.execute(f"DROP TABLE {quote(name)}")
+                    self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}")
+
+            cursor.execute(f"SELECT COUNT(*) FROM {quote(DEFAULT_PARTITION)}")
+            stray = cursor.fetchone()[0]
+            if stray:
+                self.stdout.write(self.style.WARNING(
+                    f"{stray} row(s) sit in {DEFAULT_PARTITION}; ensuring a partition for "
+                    f"their month moves them out"
+                ))
+
+        if failed:
+            raise CommandError(f"{failed} partition(s) could not be created")
@@ -0,0 +1,59 @@
+# backend/appointments/management/commands/reap_slot_holds.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from doctors.next_slot import refresh_next_free_slots
+
+
+class Command(BaseCommand):
+    help = "Delete expired slot holds in bulk (run from cron, or with --every as a sweeper loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Keep running and sweep every N seconds",
+        )
+
+    def sweep(self, batch_size):
+        reaped = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    WITH reaped AS (
+                        DELETE FROM appointments_slothold
+                        WHERE id IN (
+                            SELECT id FROM appointments_slothold
+                            WHERE expires_at <= NOW()
+                            LIMIT %s
+                            FOR UPDATE SKIP LOCKED
+                        )
+                        RETURNING doctor_id, clinic_id
+                    )
+                    SELECT
+                        (SELECT COUNT(*) FROM reaped),
+                        ARRAY(
+                            SELECT DISTINCT dc.id
+                            FROM reaped r
+                            INNER JOIN doctors_doctorclinic dc
+                                ON dc.doctor_id = r.doctor_id AND dc.clinic_id = r.clinic_id
+                        )
+                """, [batch_size])
+                deleted, doctor_clinic_ids = cursor.fetchone()
+            # Released slots can be the next free slot again
+            refresh_next_free_slots(sorted(doctor_clinic_ids))
+            reaped += deleted
+            if deleted < batch_size:
+                return reaped
+
+    def handle(self, *args, **options):
+        while True:
+            reaped = self.sweep(options["batch_size"])
+            self.stdout.write(f"Reaped {reaped} expired slot hold(s)")
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+def check_duplicate_active_appointments(apps, schema_editor):
+    """
+    The constraint cannot be added while two active appointments share a
+    (doctor, clinic, scheduled_time) slot. These are real bookings, so they
+    are not cancelled here: list them and stop, and let an operator resolve
+    them (cancelling through the app notifies both parties) before migrating.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT doctor_id, clinic_id, scheduled_time, array_agg(id ORDER BY id)
+            FROM appointments_appointment
+            WHERE status IN ('booked', 'rescheduled')
+            GROUP BY doctor_id, clinic_id, scheduled_time
+            HAVING COUNT(*) > 1
+            ORDER BY scheduled_time, doctor_id, clinic_id
+        """)
+        duplicates = cursor.fetchall()
+
+    if duplicates:
+        slots = "\n".join(
+            f"  doctor {doctor_id}, clinic {clinic_id}, {scheduled_time}: appointments {ids}"
+            for doctor_id, clinic_id, scheduled_time, ids in duplicates
+        )
+        raise RuntimeError(
+            f"{len(duplicates)} slot(s) hold more than one active appointment; cancel or "
+            f"reschedule all but one per slot, then migrate again:\n{slots}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_pastappointment'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_active_appointments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['booked', 'rescheduled'])), fields=('doctor', 'clinic', 'scheduled_time'), name='uniq_active_appointment_slot'),
+        ),
+    ]
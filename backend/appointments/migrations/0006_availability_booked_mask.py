@@ -0,0 +1,138 @@
+# appointments/migrations/0006_availability_booked_mask.py
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_appointment_time_indexes'),
+        ('doctors', '0007_doctoravailability_booked_mask'),
+    ]
+
+    operations = [
+        # Build the booked bitmap of one availability window from its active appointments
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION availability_booked_mask(
+                p_doctor_clinic_id BIGINT,
+                p_date DATE,
+                p_start TIME,
+                p_end TIME,
+                p_slot_duration INTEGER
+            )
+            RETURNS BYTEA AS $$
+            DECLARE
+                slot_count INTEGER;
+                mask BYTEA;
+                slot_index INTEGER;
+            BEGIN
+                slot_count := CEIL(EXTRACT(EPOCH FROM (p_end - p_start)) / 60.0 / p_slot_duration);
+                IF slot_count <= 0 THEN
+                    RETURN ''::bytea;
+                END IF;
+
+                mask := decode(repeat('00', (slot_count + 7) / 8), 'hex');
+
+                FOR slot_index IN
+                    SELECT (EXTRACT(EPOCH FROM (a.scheduled_time - (p_date + p_start)))::int / 60) / p_slot_duration
+                    FROM appointments_appointment a
+                    INNER JOIN doctors_doctorclinic dc
+                        ON dc.doctor_id = a.doctor_id AND dc.clinic_id = a.clinic_id
+                    WHERE dc.id = p_doctor_clinic_id
+                      AND a.scheduled_time >= p_date + p_start
+                      AND a.scheduled_time < p_date + p_end
+                      AND a.status IN ('booked', 'rescheduled')
+                      AND MOD(EXTRACT(EPOCH FROM (a.scheduled_time - (p_date + p_start)))::int / 60, p_slot_duration) = 0
+                LOOP
+                    mask := set_bit(mask, slot_index, 1);
+                END LOOP;
+
+                RETURN mask;
+            END;
+            $$ LANGUAGE plpgsql STABLE;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS availability_booked_mask(BIGINT, DATE, TIME, TIME, INTEGER);"
+        ),
+
+        # Rebuild the mask whenever a window is created or reshaped
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION availability_set_booked_mask()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                NEW.booked_mask := availability_booked_mask(
+                    NEW.doctor_clinic_id, NEW.date, NEW.start_time, NEW.end_time, NEW.slot_duration
+                );
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER trigger_availability_booked_mask
+            BEFORE INSERT OR UPDATE OF doctor_clinic_id, date, start_time, end_time, slot_duration
+            ON doctors_doctoravailability
+            FOR EACH ROW
+            EXECUTE FUNCTION availability_set_booked_mask();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS trigger_availability_booked_mask ON doctors_doctoravailability;
+            DROP FUNCTION IF EXISTS availability_set_booked_mask();
+            """
+        ),
+
+        # Keep masks in step with bookings, cancellations, reschedules and archiving
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION sync_availability_booked_mask()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    UPDATE doctors_doctoravailability da
+                    SET booked_mask = availability_booked_mask(
+                        da.doctor_clinic_id, da.date, da.start_time, da.end_time, da.slot_duration
+                    )
+                    FROM doctors_doctorclinic dc
+                    WHERE da.doctor_clinic_id = dc.id
+                      AND dc.doctor_id = OLD.doctor_id
+                      AND dc.clinic_id = OLD.clinic_id
+                      AND da.date = OLD.scheduled_time::date;
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    UPDATE doctors_doctoravailability da
+                    SET booked_mask = availability_booked_mask(
+                        da.doctor_clinic_id, da.date, da.start_time, da.end_time, da.slot_duration
+                    )
+                    FROM doctors_doctorclinic dc
+                    WHERE da.doctor_clinic_id = dc.id
+                      AND dc.doctor_id = NEW.doctor_id
+                      AND dc.clinic_id = NEW.clinic_id
+                      AND da.date = NEW.scheduled_time::date;
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER trigger_sync_booked_mask
+            AFTER INSERT OR DELETE OR UPDATE OF doctor_id, clinic_id, scheduled_time, status
+            ON appointments_appointment
+            FOR EACH ROW
+            EXECUTE FUNCTION sync_availability_booked_mask();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS trigger_sync_booked_mask ON appointments_appointment;
+            DROP FUNCTION IF EXISTS sync_availability_booked_mask();
+            """
+        ),
+
+        # Backfill existing windows
+        migrations.RunSQL(
+            sql="""
+            UPDATE doctors_doctoravailability
+            SET booked_mask = availability_booked_mask(
+                doctor_clinic_id, date, start_time, end_time, slot_duration
+            );
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
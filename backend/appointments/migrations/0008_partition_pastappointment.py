@@ -0,0 +1,179 @@
+# appointments/migrations/0008_partition_pastappointment.py
+from django.db import migrations
+
+# Archiving functions of 0002_triggers, parameterized by their ON CONFLICT target
+ARCHIVE_FUNCTIONS_SQL = """
+            CREATE OR REPLACE FUNCTION move_to_past_appointments()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                -- If appointment is marked as completed or scheduled time has passed
+                IF (NEW.status = 'completed' OR NEW.scheduled_time < NOW())
+                   AND OLD.status != 'completed' THEN
+
+                    -- Insert into past appointments
+                    INSERT INTO appointments_pastappointment (
+                        id, doctor_id, clinic_id, patient_id,
+                        scheduled_time, status, notes, created_at, completed_at
+                    )
+                    VALUES (
+                        NEW.id, NEW.doctor_id, NEW.clinic_id, NEW.patient_id,
+                        NEW.scheduled_time, NEW.status, NEW.notes, NEW.created_at, NOW()
+                    )
+                    ON CONFLICT ({conflict_target}) DO NOTHING;
+
+                    -- Delete from current appointments
+                    DELETE FROM appointments_appointment WHERE id = NEW.id;
+
+                    -- Return NULL to prevent the original update
+                    RETURN NULL;
+                END IF;
+
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION auto_complete_past_appointments()
+            RETURNS void AS $$
+            BEGIN
+                -- Move appointments where scheduled_time has passed
+                INSERT INTO appointments_pastappointment (
+                    id, doctor_id, clinic_id, patient_id,
+                    scheduled_time, status, notes, created_at, completed_at
+                )
+                SELECT
+                    id, doctor_id, clinic_id, patient_id,
+                    scheduled_time,
+                    CASE WHEN status = 'booked' THEN 'completed' ELSE status END,
+                    notes, created_at, NOW()
+                FROM appointments_appointment
+                WHERE scheduled_time < NOW()
+                  AND status NOT IN ('cancelled')
+                ON CONFLICT ({conflict_target}) DO NOTHING;
+
+                -- Delete moved appointments
+                DELETE FROM appointments_appointment
+                WHERE scheduled_time < NOW()
+                  AND status NOT IN ('cancelled');
+            END;
+            $$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_slothold'),
+    ]
+
+    operations = [
+        # Create (if missing) the monthly partition holding month_start
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION ensure_pastappointment_partition(month_start DATE)
+            RETURNS TEXT AS $$
+            DECLARE
+                first_day DATE := date_trunc('month', month_start)::date;
+                partition_name TEXT := 'appointments_pastappointment_p' || to_char(first_day, 'YYYYMM');
+            BEGIN
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF appointments_pastappointment '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, first_day, (first_day + INTERVAL '1 month')::date
+                    );
+                END IF;
+                RETURN partition_name;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS ensure_pastappointment_partition(DATE);"
+        ),
+
+        # Rebuild the table partitioned by month on scheduled_time. The primary
+        # key must include the partition key; ids still come from the old sequence.
+        migrations.RunSQL(
+            sql="""
+            ALTER TABLE appointments_pastappointment RENAME TO appointments_pastappointment_legacy;
+            ALTER TABLE appointments_pastappointment_legacy
+                RENAME CONSTRAINT appointments_pastappointment_pkey TO appointments_pastappointment_legacy_pkey;
+            ALTER SEQUENCE appointments_pastappointment_id_seq OWNED BY NONE;
+
+            CREATE TABLE appointments_pastappointment (
+                id BIGINT NOT NULL DEFAULT nextval('appointments_pastappointment_id_seq'),
+                doctor_id BIGINT NOT NULL REFERENCES doctors_doctorprofile(id) ON DELETE CASCADE,
+                clinic_id BIGINT NOT NULL REFERENCES clinic_clinic(id) ON DELETE CASCADE,
+                patient_id BIGINT NOT NULL REFERENCES patients_patientprofile(id) ON DELETE CASCADE,
+                scheduled_time TIMESTAMP NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                notes TEXT,
+                created_at TIMESTAMP NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, scheduled_time)
+            ) PARTITION BY RANGE (scheduled_time);
+
+            ALTER SEQUENCE appointments_pastappointment_id_seq OWNED BY appointments_pastappointment.id;
+
+            -- Rows outside every monthly partition land here instead of failing
+            CREATE TABLE appointments_pastappointment_default
+                PARTITION OF appointments_pastappointment DEFAULT;
+
+            -- Serve the per-user history pages (scheduled_time DESC, id DESC)
+            CREATE INDEX idx_past_appt_patient_time
+                ON appointments_pastappointment (patient_id, scheduled_time DESC, id DESC);
+            CREATE INDEX idx_past_appt_doctor_time
+                ON appointments_pastappointment (doctor_id, scheduled_time DESC, id DESC);
+
+            -- Partitions for the existing history and the next three months
+            SELECT ensure_pastappointment_partition(month::date)
+            FROM generate_series(
+                date_trunc('month', LEAST(
+                    (SELECT MIN(scheduled_time) FROM appointments_pastappointment_legacy),
+                    NOW()::timestamp
+                )),
+                date_trunc('month', NOW()::timestamp) + INTERVAL '3 months',
+                INTERVAL '1 month'
+            ) AS month;
+
+            INSERT INTO appointments_pastappointment
+            SELECT id, doctor_id, clinic_id, patient_id, scheduled_time,
+                   status, notes, created_at, completed_at
+            FROM appointments_pastappointment_legacy;
+
+            DROP TABLE appointments_pastappointment_legacy;
+            """,
+            reverse_sql="""
+            ALTER TABLE appointments_pastappointment RENAME TO appointments_pastappointment_partitioned;
+            ALTER TABLE appointments_pastappointment_partitioned
+                RENAME CONSTRAINT appointments_pastappointment_pkey TO appointments_pastappointment_partitioned_pkey;
+            ALTER SEQUENCE appointments_pastappointment_id_seq OWNED BY NONE;
+
+            CREATE TABLE appointments_pastappointment (
+                id BIGINT PRIMARY KEY DEFAULT nextval('appointments_pastappointment_id_seq'),
+                doctor_id BIGINT NOT NULL REFERENCES doctors_doctorprofile(id) ON DELETE CASCADE,
+                clinic_id BIGINT NOT NULL REFERENCES clinic_clinic(id) ON DELETE CASCADE,
+                patient_id BIGINT NOT NULL REFERENCES patients_patientprofile(id) ON DELETE CASCADE,
+                scheduled_time TIMESTAMP NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                notes TEXT,
+                created_at TIMESTAMP NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            ALTER SEQUENCE appointments_pastappointment_id_seq OWNED BY appointments_pastappointment.id;
+
+            INSERT INTO appointments_pastappointment
+            SELECT * FROM appointments_pastappointment_partitioned;
+            DROP TABLE appointments_pastappointment_partitioned CASCADE;
+
+            CREATE INDEX idx_past_appt_patient ON appointments_pastappointment(patient_id);
+            CREATE INDEX idx_past_appt_doctor ON appointments_pastappointment(doctor_id);
+            CREATE INDEX idx_past_appt_scheduled ON appointments_pastappointment(scheduled_time);
+            """
+        ),
+
+        # A unique index on id alone is impossible on the partitioned table, so
+        # the archiving functions skip duplicates on (id, scheduled_time)
+        migrations.RunSQL(
+            sql=ARCHIVE_FUNCTIONS_SQL.format(conflict_target="id, scheduled_time"),
+            reverse_sql=ARCHIVE_FUNCTIONS_SQL.format(conflict_target="id"),
+        ),
+    ]
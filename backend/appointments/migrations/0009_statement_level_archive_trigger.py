@@ -0,0 +1,68 @@
+# appointments/migrations/0009_statement_level_archive_trigger.py
+from django.db import migrations
+
+# Row-level trigger of 0002_triggers: one INSERT plus one DELETE per updated row
+ROW_TRIGGER_SQL = """
+    CREATE TRIGGER trigger_move_to_past
+    AFTER UPDATE ON appointments_appointment
+    FOR EACH ROW
+    EXECUTE FUNCTION move_to_past_appointments();
+"""
+
+# Statement-level replacement: archives every qualifying row of the UPDATE
+# with one INSERT ... SELECT and one DELETE over the transition tables
+STATEMENT_TRIGGER_SQL = """
+    CREATE TRIGGER trigger_move_to_past
+    AFTER UPDATE ON appointments_appointment
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION move_to_past_appointments_bulk();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_partition_pastappointment'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION move_to_past_appointments_bulk()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                -- Rows marked as completed or whose scheduled time has passed
+                WITH qualifying AS (
+                    SELECT n.*
+                    FROM new_rows n
+                    INNER JOIN old_rows o ON o.id = n.id
+                    WHERE (n.status = 'completed' OR n.scheduled_time < NOW())
+                      AND o.status != 'completed'
+                ),
+                archived AS (
+                    INSERT INTO appointments_pastappointment (
+                        id, doctor_id, clinic_id, patient_id,
+                        scheduled_time, status, notes, created_at, completed_at
+                    )
+                    SELECT
+                        id, doctor_id, clinic_id, patient_id,
+                        scheduled_time, status, notes, created_at, NOW()
+                    FROM qualifying
+                    ON CONFLICT (id, scheduled_time) DO NOTHING
+                )
+                DELETE FROM appointments_appointment a
+                USING qualifying q
+                WHERE a.id = q.id;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS move_to_past_appointments_bulk();"
+        ),
+        migrations.RunSQL(
+            sql="DROP TRIGGER IF EXISTS trigger_move_to_past ON appointments_appointment;" + STATEMENT_TRIGGER_SQL,
+            reverse_sql="DROP TRIGGER IF EXISTS trigger_move_to_past ON appointments_appointment;" + ROW_TRIGGER_SQL,
+        ),
+    ]
@@ -0,0 +1,139 @@
+# appointments/migrations/0011_statement_level_booked_mask_sync.py
+from django.db import migrations
+
+# Row-level sync of 0006: one availability UPDATE per side of every changed row
+ROW_SYNC_TRIGGER_SQL = """
+    CREATE TRIGGER trigger_sync_booked_mask
+    AFTER INSERT OR DELETE OR UPDATE OF doctor_id, clinic_id, scheduled_time, status
+    ON appointments_appointment
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_availability_booked_mask();
+"""
+
+# Statement-level replacement: one set-based UPDATE per statement, touching
+# each affected (availability, day) once. Transition tables do not allow
+# column lists, so UPDATE compares old and new rows itself.
+STATEMENT_SYNC_TRIGGERS_SQL = """
+    CREATE TRIGGER trigger_sync_booked_mask_insert
+    AFTER INSERT ON appointments_appointment
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_availability_booked_masks_bulk();
+
+    CREATE TRIGGER trigger_sync_booked_mask_update
+    AFTER UPDATE ON appointments_appointment
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_availability_booked_masks_bulk();
+
+    CREATE TRIGGER trigger_sync_booked_mask_delete
+    AFTER DELETE ON appointments_appointment
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sync_availability_booked_masks_bulk();
+"""
+
+DROP_STATEMENT_SYNC_TRIGGERS_SQL = """
+    DROP TRIGGER IF EXISTS trigger_sync_booked_mask_insert ON appointments_appointment;
+    DROP TRIGGER IF EXISTS trigger_sync_booked_mask_update ON appointments_appointment;
+    DROP TRIGGER IF EXISTS trigger_sync_booked_mask_delete ON appointments_appointment;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0010_appointment_doctor_time_idx'),
+    ]
+
+    operations = [
+        # Recompute the masks of the given (doctor, clinic, day) triples, each
+        # window once, locking the windows in id order so concurrent
+        # statements cannot deadlock on them
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION refresh_booked_masks(
+                p_doctor_ids BIGINT[],
+                p_clinic_ids BIGINT[],
+                p_days DATE[]
+            )
+            RETURNS void AS $$
+                WITH affected AS (
+                    SELECT DISTINCT doctor_id, clinic_id, day
+                    FROM unnest(p_doctor_ids, p_clinic_ids, p_days) AS x(doctor_id, clinic_id, day)
+                ),
+                targets AS (
+                    SELECT da.id
+                    FROM doctors_doctoravailability da
+                    INNER JOIN doctors_doctorclinic dc ON da.doctor_clinic_id = dc.id
+                    INNER JOIN affected x
+                        ON dc.doctor_id = x.doctor_id
+                       AND dc.clinic_id = x.clinic_id
+                       AND da.date = x.day
+                    ORDER BY da.id
+                    FOR UPDATE OF da
+                )
+                UPDATE doctors_doctoravailability da
+                SET booked_mask = availability_booked_mask(
+                    da.doctor_clinic_id, da.date, da.start_time, da.end_time, da.slot_duration
+                )
+                FROM targets t
+                WHERE da.id = t.id;
+            $$ LANGUAGE sql;
+
+            CREATE OR REPLACE FUNCTION sync_availability_booked_masks_bulk()
+            RETURNS TRIGGER AS $$
+            DECLARE
+                doctor_ids BIGINT[];
+                clinic_ids BIGINT[];
+                days DATE[];
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT array_agg(doctor_id), array_agg(clinic_id), array_agg(scheduled_time::date)
+                    INTO doctor_ids, clinic_ids, days
+                    FROM new_rows;
+                ELSIF TG_OP = 'DELETE' THEN
+                    SELECT array_agg(doctor_id), array_agg(clinic_id), array_agg(scheduled_time::date)
+                    INTO doctor_ids, clinic_ids, days
+                    FROM old_rows;
+                ELSE
+                    -- Both the old and the new day of rows whose slot or status changed
+                    WITH changed AS (
+                        SELECT o.doctor_id AS old_doctor_id, o.clinic_id AS old_clinic_id,
+                               o.scheduled_time AS old_time,
+                               n.doctor_id, n.clinic_id, n.scheduled_time
+                        FROM old_rows o
+                        INNER JOIN new_rows n ON n.id = o.id
+                        WHERE (o.doctor_id, o.clinic_id, o.scheduled_time, o.status)
+                              IS DISTINCT FROM (n.doctor_id, n.clinic_id, n.scheduled_time, n.status)
+                    ),
+                    sides AS (
+                        SELECT old_doctor_id AS doctor_id, old_clinic_id AS clinic_id, old_time::date AS day
+                        FROM changed
+                        UNION
+                        SELECT doctor_id, clinic_id, scheduled_time::date FROM changed
+                    )
+                    SELECT array_agg(doctor_id), array_agg(clinic_id), array_agg(day)
+                    INTO doctor_ids, clinic_ids, days
+                    FROM sides;
+                END IF;
+
+                IF doctor_ids IS NOT NULL THEN
+                    PERFORM refresh_booked_masks(doctor_ids, clinic_ids, days);
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            reverse_sql="""
+            DROP FUNCTION IF EXISTS sync_availability_booked_masks_bulk();
+            DROP FUNCTION IF EXISTS refresh_booked_masks(BIGINT[], BIGINT[], DATE[]);
+            """
+        ),
+        migrations.RunSQL(
+            sql="DROP TRIGGER IF EXISTS trigger_sync_booked_mask ON appointments_appointment;"
+                + STATEMENT_SYNC_TRIGGERS_SQL,
+            reverse_sql=DROP_STATEMENT_SYNC_TRIGGERS_SQL + ROW_SYNC_TRIGGER_SQL,
+        ),
+    ]
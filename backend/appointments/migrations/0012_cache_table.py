@@ -0,0 +1,20 @@
+# appointments/migrations/0012_cache_table.py
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # No-op for non-database backends and for tables that already exist
+    call_command("createcachetable", database=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0011_statement_level_booked_mask_sync'),
+    ]
+
+    operations = [
+        # The shared cache behind slot caches, version stamps and the clinic catalog
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0012_cache_table'),
+    ]
+
+    operations = [
+        # appt_doctor_time_idx (0010) covers the same (doctor, scheduled_time)
+        # scans and also the cancelled rows the timeline lists
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appt_doctor_time_active_idx',
+        ),
+    ]
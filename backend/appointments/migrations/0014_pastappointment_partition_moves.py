@@ -0,0 +1,122 @@
+# appointments/migrations/0014_pastappointment_partition_moves.py
+import django.db.models.deletion
+from django.db import migrations, models
+
+STATUS_CHOICES = [
+    ('booked', 'Booked'),
+    ('cancelled', 'Cancelled'),
+    ('completed', 'Completed'),
+    ('rescheduled', 'Rescheduled'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_remove_appt_doctor_time_active_idx'),
+        ('clinic', '0001_initial'),
+        ('doctors', '0004_remove_doctorprofile_clinic_name'),
+        ('patients', '0002_initial'),
+    ]
+
+    operations = [
+        # CREATE TABLE ... PARTITION OF fails while the DEFAULT partition holds
+        # rows of the new month. Detach DEFAULT, create the partition, move
+        # the month's rows into it and re-attach DEFAULT, all in one transaction.
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION ensure_pastappointment_partition(month_start DATE)
+            RETURNS TEXT AS $$
+            DECLARE
+                first_day DATE := date_trunc('month', month_start)::date;
+                next_day DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::date;
+                partition_name TEXT := 'appointments_pastappointment_p' || to_char(first_day, 'YYYYMM');
+                stray BIGINT;
+            BEGIN
+                IF to_regclass(partition_name) IS NOT NULL THEN
+                    RETURN partition_name;
+                END IF;
+
+                SELECT COUNT(*) INTO stray
+                FROM appointments_pastappointment_default
+                WHERE scheduled_time >= first_day AND scheduled_time < next_day;
+
+                IF stray > 0 THEN
+                    ALTER TABLE appointments_pastappointment
+                        DETACH PARTITION appointments_pastappointment_default;
+                END IF;
+
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF appointments_pastappointment '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, first_day, next_day
+                );
+
+                IF stray > 0 THEN
+                    EXECUTE format(
+                        'WITH moved AS ('
+                        '    DELETE FROM appointments_pastappointment_default'
+                        '    WHERE scheduled_time >= %L AND scheduled_time < %L'
+                        '    RETURNING id, doctor_id, clinic_id, patient_id, scheduled_time,'
+                        '              status, notes, created_at, completed_at'
+                        ') '
+                        'INSERT INTO %I (id, doctor_id, clinic_id, patient_id, scheduled_time,'
+                        '                status, notes, created_at, completed_at) '
+                        'SELECT * FROM moved',
+                        first_day, next_day, partition_name
+                    );
+                    ALTER TABLE appointments_pastappointment
+                        ATTACH PARTITION appointments_pastappointment_default DEFAULT;
+                    RAISE NOTICE 'Moved % row(s) from the default partition into %', stray, partition_name;
+                END IF;
+
+                RETURN partition_name;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            # The 0008 version, which fails while DEFAULT holds rows of the month
+            reverse_sql="""
+            CREATE OR REPLACE FUNCTION ensure_pastappointment_partition(month_start DATE)
+            RETURNS TEXT AS $$
+            DECLARE
+                first_day DATE := date_trunc('month', month_start)::date;
+                partition_name TEXT := 'appointments_pastappointment_p' || to_char(first_day, 'YYYYMM');
+            BEGIN
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF appointments_pastappointment '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, first_day, (first_day + INTERVAL '1 month')::date
+                    );
+                END IF;
+                RETURN partition_name;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+        ),
+
+        # The model's primary key now matches the table's (id, scheduled_time)
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.DeleteModel(name='PastAppointment'),
+                migrations.CreateModel(
+                    name='PastAppointment',
+                    fields=[
+                        ('pk', models.CompositePrimaryKey('id', 'scheduled_time', blank=True, editable=False, primary_key=True, serialize=False)),
+                        ('id', models.BigIntegerField()),
+                        ('scheduled_time', models.DateTimeField()),
+                        ('status', models.CharField(choices=STATUS_CHOICES, max_length=20)),
+                        ('notes', models.TextField(blank=True)),
+                        ('created_at', models.DateTimeField()),
+                        ('completed_at', models.DateTimeField(auto_now_add=True)),
+                        ('clinic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clinic.clinic')),
+                        ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='doctors.doctorprofile')),
+                        ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='patients.patientprofile')),
+                    ],
+                    options={
+                        'db_table': 'appointments_pastappointment',
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# appointments/migrations/0015_doctorclinic_next_free_slot_function.py
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0014_pastappointment_partition_moves'),
+    ]
+
+    operations = [
+        # Earliest free future slot of one doctor-clinic within the horizon.
+        # Windows are walked in (date, start_time) index order and slots are
+        # tested against booked_mask (bit i = slot i, as set by set_bit()),
+        # so the walk stops at the first free slot instead of expanding and
+        # probing every future slot of the schedule.
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION doctorclinic_next_free_slot(
+                p_doctor_clinic_id BIGINT,
+                p_horizon_days INTEGER
+            )
+            RETURNS TIMESTAMP AS $$
+            DECLARE
+                v_doctor_id BIGINT;
+                v_clinic_id BIGINT;
+                w RECORD;
+                slot_count INTEGER;
+                slot_index INTEGER;
+                slot TIMESTAMP;
+            BEGIN
+                SELECT doctor_id, clinic_id INTO v_doctor_id, v_clinic_id
+                FROM doctors_doctorclinic
+                WHERE id = p_doctor_clinic_id;
+
+                FOR w IN
+                    SELECT date, start_time, end_time, slot_duration, booked_mask
+                    FROM doctors_doctoravailability
+                    WHERE doctor_clinic_id = p_doctor_clinic_id
+                      AND date >= CURRENT_DATE
+                      AND date < CURRENT_DATE + p_horizon_days
+                      AND is_available = TRUE
+                    ORDER BY date, start_time
+                LOOP
+                    slot_count := CEIL(EXTRACT(EPOCH FROM (w.end_time - w.start_time)) / 60.0 / w.slot_duration);
+
+                    FOR slot_index IN 0 .. slot_count - 1 LOOP
+                        slot := w.date + w.start_time + make_interval(mins => slot_index * w.slot_duration);
+
+                        CONTINUE WHEN slot <= LOCALTIMESTAMP;
+                        CONTINUE WHEN w.booked_mask IS NOT NULL
+                            AND slot_index < length(w.booked_mask) * 8
+                            AND get_bit(w.booked_mask, slot_index) = 1;
+                        CONTINUE WHEN EXISTS (
+                            SELECT 1 FROM appointments_slothold h
+                            WHERE h.doctor_id = v_doctor_id
+                              AND h.clinic_id = v_clinic_id
+                              AND h.scheduled_time = slot
+                              AND h.expires_at > NOW()
+                        );
+
+                        RETURN slot;
+                    END LOOP;
+                END LOOP;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql STABLE;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS doctorclinic_next_free_slot(BIGINT, INTEGER);"
+        ),
+    ]
@@ -20,9 +20,78 @@ class Appointment(models.Model):
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Only one active appointment may hold a doctor's slot at a clinic
+            models.UniqueConstraint(
+                fields=["doctor", "clinic", "scheduled_time"],
+                condition=models.Q(status__in=["booked", "rescheduled"]),
+                name="uniq_active_appointment_slot",
+            ),
+        ]
+        indexes = [
+            # Doctor schedule scans (availability conflicts, upcoming appointments)
+            # and the doctor timeline, which also lists cancelled appointments
+            models.Index(fields=["doctor", "scheduled_time"], name="appt_doctor_time_idx"),
+            # Patient history and upcoming appointments
+            models.Index(fields=["patient", "scheduled_time"], name="appt_patient_time_idx"),
+        ]
+
+    # Fields whose loaded values are remembered, so saves can tell what changed
+    # without reading the row again
+    TRACKED_FIELDS = ("status", "scheduled_time")
+
     def __str__(self):
         return f"{self.patient} with {self.doctor} at {self.clinic} on {self.scheduled_time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+
+    def snapshot_tracked_fields(self):
+        # Deferred fields are left out rather than loaded
+        self._original = {
+            name: self.__dict__[name] for name in self.TRACKED_FIELDS if name in self.__dict__
+        }
+
+    def has_snapshot(self):
+        return hasattr(self, "_original")
+
+    def original(self, name):
+        """Value of a tracked field as loaded (or last saved)"""
+        return self._original.get(name, getattr(self, name))
+
+    def has_changed(self, name):
+        return self.has_snapshot() and self.original(name) != getattr(self, name)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have already seen the old values
+        self.snapshot_tracked_fields()
+
+
+class SlotHold(models.Model):
+    """Short-lived reservation of a slot while a patient completes booking"""
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE)
+    clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE)
+    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE)
+    scheduled_time = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["doctor", "clinic", "scheduled_time"],
+                name="uniq_slot_hold",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Hold: {self.patient} with {self.doctor} at {self.scheduled_time} until {self.expires_at}"
+
 
 class PastAppointment(models.Model):
     STATUS_CHOICES = [
@@ -32,6 +101,10 @@ class PastAppointment(models.Model):
         ("rescheduled", "Rescheduled"),
     ]
 
+    # The table is partitioned by scheduled_time, so its primary key is
+    # (id, scheduled_time); ids are copied from appointments_appointment
+    pk = models.CompositePrimaryKey("id", "scheduled_time")
+    id = models.BigIntegerField()
     doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE)
     clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE)
     patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE)
@@ -0,0 +1,18 @@
+# appointments/serializers.py
+from rest_framework import serializers
+
+
+class TimelineEntrySerializer(serializers.Serializer):
+    source = serializers.CharField()
+    id = serializers.IntegerField()
+    doctor_id = serializers.IntegerField()
+    doctor_name = serializers.CharField()
+    patient_id = serializers.IntegerField()
+    patient_name = serializers.CharField()
+    clinic_id = serializers.IntegerField()
+    clinic_name = serializers.CharField()
+    scheduled_time = serializers.DateTimeField()
+    status = serializers.CharField()
+    notes = serializers.CharField(allow_blank=True, allow_null=True)
+    created_at = serializers.DateTimeField()
+    completed_at = serializers.DateTimeField(allow_null=True)
@@ -2,91 +2,135 @@
 """
 Signal handlers for appointment notifications
 Triggers both in-app and email notifications
+
+Only ORM saves fire post_save. The raw-SQL booking and cancel views in
+patients/views.py do not, so they are not covered here; cancel_clinic_day
+calls notify_cancellation() itself.
 """
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import connection
 from django.utils import timezone
 from .models import Appointment
+from collections import namedtuple
 import logging
 
 logger = logging.getLogger('appointments.signals')
 
+Participant = namedtuple("Participant", ["id", "first_name", "last_name", "email"])
+
+# Both users and the clinic name in one round trip, instead of lazily
+# loading doctor, doctor.user, patient, patient.user and clinic
+PARTICIPANTS_SQL = """
+    SELECT
+        du.id, du.first_name, du.last_name, du.email,
+        pu.id, pu.first_name, pu.last_name, pu.email,
+        c.name
+    FROM doctors_doctorprofile dp
+    INNER JOIN users_user du ON dp.user_id = du.id
+    CROSS JOIN patients_patientprofile pp
+    INNER JOIN users_user pu ON pp.user_id = pu.id
+    CROSS JOIN clinic_clinic c
+    WHERE dp.id = %s AND pp.id = %s AND c.id = %s
+"""
+
+
+def fetch_participants(appointment):
+    """Return (doctor_user, patient_user, clinic_name) of an appointment"""
+    with connection.cursor() as cursor:
+        cursor.execute(PARTICIPANTS_SQL, [appointment.doctor_id, appointment.patient_id, appointment.clinic_id])
+        row = cursor.fetchone()
+    return Participant(*row[0:4]), Participant(*row[4:8]), row[8]
+
+
+# The users and clinics of many appointments in one round trip; rows are
+# keyed by profile (or clinic) id, so shared doctors are loaded once
+PARTICIPANTS_MANY_SQL = """
+    SELECT 'doctor', dp.id, u.id, u.first_name, u.last_name, u.email
+    FROM doctors_doctorprofile dp
+    INNER JOIN users_user u ON dp.user_id = u.id
+    WHERE dp.id = ANY(%s)
+    UNION ALL
+    SELECT 'patient', pp.id, u.id, u.first_name, u.last_name, u.email
+    FROM patients_patientprofile pp
+    INNER JOIN users_user u ON pp.user_id = u.id
+    WHERE pp.id = ANY(%s)
+    UNION ALL
+    SELECT 'clinic', c.id, NULL, c.name, NULL, NULL
+    FROM clinic_clinic c
+    WHERE c.id = ANY(%s)
+"""
+
+
+def fetch_participants_many(appointments):
+    """Return {appointment id: (doctor_user, patient_user, clinic_name)} for many appointments"""
+    with connection.cursor() as cursor:
+        cursor.execute(PARTICIPANTS_MANY_SQL, [
+            list({a.doctor_id for a in appointments}),
+            list({a.patient_id for a in appointments}),
+            list({a.clinic_id for a in appointments}),
+        ])
+        rows = cursor.fetchall()
+
+    doctors, patients, clinics = {}, {}, {}
+    for kind, key, user_id, first_name, last_name, email in rows:
+        if kind == 'clinic':
+            clinics[key] = first_name
+        else:
+            (doctors if kind == 'doctor' else patients)[key] = Participant(user_id, first_name, last_name, email)
+    return {
+        a.id: (doctors[a.doctor_id], patients[a.patient_id], clinics[a.clinic_id])
+        for a in appointments
+    }
+
 
 def create_notification(user, title, message, notification_type, meta=None):
-    """Create in-app notification"""
-    from notifications.models import Notification
-    
-    Notification.objects.create(
-        recipient=user,
-        title=title,
-        message=message,
-        notification_type=notification_type,
-        meta=meta or {},
-        is_read=False
-    )
+    """Queue an in-app notification; written in bulk with the rest of the fan-out"""
+    from notifications.fanout import notify
+    notify(user.id, title, message, notification_type, meta)
 
 
-def send_notification_email(recipient_email, subject, message):
-    """Send email notification"""
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            fail_silently=False,
-        )
-        logger.info(f"Email sent to {recipient_email}")
-        
-        # Log to EmailLog
-        from notifications.models import EmailLog
-        EmailLog.objects.create(
-            recipient_email=recipient_email,
-            subject=subject,
-            body=message,
-            status='sent',
-            sent_at=timezone.now()
-        )
-    except Exception as e:
-        logger.error(f"Failed to send email to {recipient_email}: {str(e)}")
-        from notifications.models import EmailLog
-        EmailLog.objects.create(
-            recipient_email=recipient_email,
-            subject=subject,
-            body=message,
-            status='failed',
-            error_message=str(e)
-        )
+def send_notification_email(recipient_email, subject, message, notification_type=""):
+    """Queue an email notification; the outbox dispatcher delivers it after commit"""
+    from notifications.outbox import enqueue_email
+    enqueue_email(recipient_email, subject, message, notification_type)
 
 
 @receiver(pre_save, sender=Appointment)
 def capture_old_appointment(sender, instance, **kwargs):
-    """Capture old appointment data before save"""
-    if instance.pk:
-        try:
-            instance._old_instance = Appointment.objects.get(pk=instance.pk)
-        except Appointment.DoesNotExist:
-            instance._old_instance = None
-    else:
-        instance._old_instance = None
+    """
+    Snapshot tracked fields of an instance that was not loaded from the
+    database (e.g. Appointment(pk=...)); loaded instances already carry one
+    """
+    if instance.pk and not instance.has_snapshot():
+        instance._original = (
+            Appointment.objects.filter(pk=instance.pk)
+            .values(*Appointment.TRACKED_FIELDS)
+            .first()
+        ) or {}
 
 
 @receiver(post_save, sender=Appointment)
 def appointment_notification_handler(sender, instance, created, **kwargs):
+    """Notify both parties; all rows of one event (or of an enclosing fan-out) go out in bulk"""
+    from notifications.fanout import notification_fanout
+    with notification_fanout():
+        notify_appointment_change(instance, created)
+
+
+def notify_appointment_change(instance, created):
     """
     Handles all appointment notifications
     Triggers on: Create, Reschedule, Cancel, Status Change
     """
     
-    # Get users
-    doctor_user = instance.doctor.user
-    patient_user = instance.patient.user
-    
-    # Get clinic name
-    clinic_name = instance.clinic.name
-    
+    status_changed = not created and instance.has_changed('status')
+    time_changed = not created and instance.has_changed('scheduled_time')
+    if not (created or (status_changed and instance.status == 'cancelled') or time_changed):
+        return
+
+    doctor_user, patient_user, clinic_name = fetch_participants(instance)
+
     # Format appointment details
     appt_datetime = instance.scheduled_time
     appt_date = appt_datetime.strftime("%Y-%m-%d")
@@ -123,6 +167,7 @@ def appointment_notification_handler(sender, instance, created, **kwargs):
         
         send_notification_email(
             recipient_email=doctor_user.email,
+            notification_type='appointment_booked',
             subject=f"Medicare: New Appointment - {patient_user.first_name} {patient_user.last_name}",
             message=f"""
 Dear Dr. {doctor_user.last_name},
@@ -157,6 +202,7 @@ Medicare Team
         
         send_notification_email(
             recipient_email=patient_user.email,
+            notification_type='appointment_booked',
             subject=f"Medicare: Appointment Confirmed with Dr. {doctor_user.last_name}",
             message=f"""
 Dear {patient_user.first_name},
@@ -180,168 +226,187 @@ Medicare Team
         return
     
     # CASE 2: APPOINTMENT UPDATED (Reschedule or Cancel)
-    if hasattr(instance, '_old_instance') and instance._old_instance:
-        old = instance._old_instance
+    old_scheduled_time = instance.original('scheduled_time')
+
+    # CASE 2A: CANCELLED
+    if status_changed and instance.status == 'cancelled':
+        notify_cancellation(instance, doctor_user, patient_user, clinic_name)
+    
+    # CASE 2B: RESCHEDULED
+    elif time_changed:
+        action_type = "Appointment Rescheduled"
+        
+        old_date = old_scheduled_time.strftime("%Y-%m-%d")
+        old_time = old_scheduled_time.strftime("%H:%M")
+        
+        # Notify Doctor
+        doctor_title = f"Appointment Rescheduled: {patient_user.first_name} {patient_user.last_name}"
+        doctor_message = f"Patient {patient_user.first_name} {patient_user.last_name}'s appointment has been rescheduled from {old_date} {old_time} to {appt_date} {appt_time} at {clinic_name}."
+        meta['type'] = action_type
+        meta['withName'] = f"{patient_user.first_name} {patient_user.last_name}"
         
-        # Check what changed
-        status_changed = old.status != instance.status
-        time_changed = old.scheduled_time != instance.scheduled_time
+        create_notification(
+            user=doctor_user,
+            title=doctor_title,
+            message=doctor_message,
+            notification_type='appointment_rescheduled',
+            meta=meta.copy()
+        )
         
-        # CASE 2A: CANCELLED
-        if status_changed and instance.status == 'cancelled':
-            action_type = "Appointment Cancelled"
-            
-            # Notify Doctor
-            doctor_title = f"Appointment Cancelled: {patient_user.first_name} {patient_user.last_name}"
-            doctor_message = f"Patient {patient_user.first_name} {patient_user.last_name}'s appointment at {clinic_name} on {appt_date} at {appt_time} has been cancelled."
-            meta['type'] = action_type
-            meta['withName'] = f"{patient_user.first_name} {patient_user.last_name}"
-            
-            create_notification(
-                user=doctor_user,
-                title=doctor_title,
-                message=doctor_message,
-                notification_type='appointment_cancelled',
-                meta=meta.copy()
-            )
-            
-            send_notification_email(
-                recipient_email=doctor_user.email,
-                subject=f"Medicare: Appointment Cancelled - {patient_user.first_name} {patient_user.last_name}",
-                message=f"""
+        send_notification_email(
+            recipient_email=doctor_user.email,
+            notification_type='appointment_rescheduled',
+            subject=f"Medicare: Appointment Rescheduled - {patient_user.first_name} {patient_user.last_name}",
+            message=f"""
 Dear Dr. {doctor_user.last_name},
 
-An appointment has been cancelled:
+An appointment has been rescheduled:
 
 Patient: {patient_user.first_name} {patient_user.last_name}
 Clinic: {clinic_name}
-Original Date: {appt_date}
-Original Time: {appt_time}
 
-The time slot is now available.
+Previous Schedule:
+Date: {old_date}
+Time: {old_time}
+
+New Schedule:
+Date: {appt_date}
+Time: {appt_time}
 
 Best regards,
 Medicare Team
-                """
-            )
-            
-            # Notify Patient
-            patient_title = "Appointment Cancelled"
-            patient_message = f"Your appointment with Dr. {doctor_user.first_name} {doctor_user.last_name} at {clinic_name} has been cancelled."
-            meta['withName'] = f"Dr. {doctor_user.first_name} {doctor_user.last_name}"
-            
-            create_notification(
-                user=patient_user,
-                title=patient_title,
-                message=patient_message,
-                notification_type='appointment_cancelled',
-                meta=meta.copy()
-            )
-            
-            send_notification_email(
-                recipient_email=patient_user.email,
-                subject=f"Medicare: Appointment Cancellation Confirmed",
-                message=f"""
+            """
+        )
+        
+        # Notify Patient
+        patient_title = "Appointment Rescheduled"
+        patient_message = f"Your appointment with Dr. {doctor_user.first_name} {doctor_user.last_name} has been rescheduled to {appt_date} at {appt_time} at {clinic_name}."
+        meta['withName'] = f"Dr. {doctor_user.first_name} {doctor_user.last_name}"
+        
+        create_notification(
+            user=patient_user,
+            title=patient_title,
+            message=patient_message,
+            notification_type='appointment_rescheduled',
+            meta=meta.copy()
+        )
+        
+        send_notification_email(
+            recipient_email=patient_user.email,
+            notification_type='appointment_rescheduled',
+            subject=f"Medicare: Appointment Rescheduled with Dr. {doctor_user.last_name}",
+            message=f"""
 Dear {patient_user.first_name},
 
-Your appointment has been cancelled:
+Your appointment has been rescheduled:
 
 Doctor: Dr. {doctor_user.first_name} {doctor_user.last_name}
 Clinic: {clinic_name}
+
+Previous Schedule:
+Date: {old_date}
+Time: {old_time}
+
+New Schedule:
 Date: {appt_date}
 Time: {appt_time}
 
-You can book a new appointment anytime.
+Please mark your calendar accordingly.
 
 Best regards,
 Medicare Team
-                """
-            )
-            
-            logger.info(f"Appointment #{instance.id} cancelled - notifications sent")
+            """
+        )
         
-        # CASE 2B: RESCHEDULED
-        elif time_changed:
-            action_type = "Appointment Rescheduled"
-            
-            old_date = old.scheduled_time.strftime("%Y-%m-%d")
-            old_time = old.scheduled_time.strftime("%H:%M")
-            
-            # Notify Doctor
-            doctor_title = f"Appointment Rescheduled: {patient_user.first_name} {patient_user.last_name}"
-            doctor_message = f"Patient {patient_user.first_name} {patient_user.last_name}'s appointment has been rescheduled from {old_date} {old_time} to {appt_date} {appt_time} at {clinic_name}."
-            meta['type'] = action_type
-            meta['withName'] = f"{patient_user.first_name} {patient_user.last_name}"
-            
-            create_notification(
-                user=doctor_user,
-                title=doctor_title,
-                message=doctor_message,
-                notification_type='appointment_rescheduled',
-                meta=meta.copy()
-            )
-            
-            send_notification_email(
-                recipient_email=doctor_user.email,
-                subject=f"Medicare: Appointment Rescheduled - {patient_user.first_name} {patient_user.last_name}",
-                message=f"""
+        logger.info(f"Appointment #{instance.id} rescheduled - notifications sent")
+
+
+def notify_cancellation(instance, doctor_user, patient_user, clinic_name):
+    """
+    Notify both parties of a cancelled appointment; instance only needs
+    id, scheduled_time and status (cancel_clinic_day passes RETURNING rows)
+    """
+    appt_date = instance.scheduled_time.strftime("%Y-%m-%d")
+    appt_time = instance.scheduled_time.strftime("%H:%M")
+    meta = {
+        'type': None,
+        'withName': None,
+        'clinic_name': clinic_name,
+        'date': appt_date,
+        'time': appt_time,
+        'status': instance.status.title(),
+        'created_at': timezone.now().isoformat()
+    }
+
+    action_type = "Appointment Cancelled"
+    
+    # Notify Doctor
+    doctor_title = f"Appointment Cancelled: {patient_user.first_name} {patient_user.last_name}"
+    doctor_message = f"Patient {patient_user.first_name} {patient_user.last_name}'s appointment at {clinic_name} on {appt_date} at {appt_time} has been cancelled."
+    meta['type'] = action_type
+    meta['withName'] = f"{patient_user.first_name} {patient_user.last_name}"
+    
+    create_notification(
+        user=doctor_user,
+        title=doctor_title,
+        message=doctor_message,
+        notification_type='appointment_cancelled',
+        meta=meta.copy()
+    )
+    
+    send_notification_email(
+        recipient_email=doctor_user.email,
+        notification_type='appointment_cancelled',
+        subject=f"Medicare: Appointment Cancelled - {patient_user.first_name} {patient_user.last_name}",
+        message=f"""
 Dear Dr. {doctor_user.last_name},
 
-An appointment has been rescheduled:
+An appointment has been cancelled:
 
 Patient: {patient_user.first_name} {patient_user.last_name}
 Clinic: {clinic_name}
+Original Date: {appt_date}
+Original Time: {appt_time}
 
-Previous Schedule:
-Date: {old_date}
-Time: {old_time}
-
-New Schedule:
-Date: {appt_date}
-Time: {appt_time}
+The time slot is now available.
 
 Best regards,
 Medicare Team
-                """
-            )
-            
-            # Notify Patient
-            patient_title = "Appointment Rescheduled"
-            patient_message = f"Your appointment with Dr. {doctor_user.first_name} {doctor_user.last_name} has been rescheduled to {appt_date} at {appt_time} at {clinic_name}."
-            meta['withName'] = f"Dr. {doctor_user.first_name} {doctor_user.last_name}"
-            
-            create_notification(
-                user=patient_user,
-                title=patient_title,
-                message=patient_message,
-                notification_type='appointment_rescheduled',
-                meta=meta.copy()
-            )
-            
-            send_notification_email(
-                recipient_email=patient_user.email,
-                subject=f"Medicare: Appointment Rescheduled with Dr. {doctor_user.last_name}",
-                message=f"""
+        """
+    )
+    
+    # Notify Patient
+    patient_title = "Appointment Cancelled"
+    patient_message = f"Your appointment with Dr. {doctor_user.first_name} {doctor_user.last_name} at {clinic_name} has been cancelled."
+    meta['withName'] = f"Dr. {doctor_user.first_name} {doctor_user.last_name}"
+    
+    create_notification(
+        user=patient_user,
+        title=patient_title,
+        message=patient_message,
+        notification_type='appointment_cancelled',
+        meta=meta.copy()
+    )
+    
+    send_notification_email(
+        recipient_email=patient_user.email,
+        notification_type='appointment_cancelled',
+        subject=f"Medicare: Appointment Cancellation Confirmed",
+        message=f"""
 Dear {patient_user.first_name},
 
-Your appointment has been rescheduled:
+Your appointment has been cancelled:
 
 Doctor: Dr. {doctor_user.first_name} {doctor_user.last_name}
 Clinic: {clinic_name}
-
-Previous Schedule:
-Date: {old_date}
-Time: {old_time}
-
-New Schedule:
 Date: {appt_date}
 Time: {appt_time}
 
-Please mark your calendar accordingly.
+You can book a new appointment anytime.
 
 Best regards,
 Medicare Team
-                """
-            )
-            
-            logger.info(f"Appointment #{instance.id} rescheduled - notifications sent")
\ No newline at end of file
+        """
+    )
+    
+    logger.info(f"Appointment #{instance.id} cancelled - notifications sent")
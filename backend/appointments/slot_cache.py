@@ -0,0 +1,82 @@
+# backend/appointments/slot_cache.py
+"""
+Slot availability cache
+Caches the packed availability windows (slot layout plus booked bitmap) of
+one (doctor_clinic, date) on top of Django's cache framework. Entries are
+keyed by the day's availability version token as well, so a reader that
+loaded the windows before a change can only store them under the old
+version, which no later reader looks up. Views that change bookings or
+availability call invalidate_slots() for exactly the day they touched,
+which gives the day a new availability version (and so a new cache key
+and ETag); entries of old versions lapse after SLOT_CACHE_TIMEOUT.
+Hit/miss counters are kept per worker process, so counting costs no
+cache round trip.
+"""
+from django.core.cache import cache
+from backend.conditional import bump_version
+from collections import Counter
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SLOT_CACHE_TIMEOUT = 60 * 10
+SLOT_CACHE_PREFIX = "slots"
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+
+
+def slot_cache_key(doctor_clinic_id, slot_date, version):
+    """Cache key for one doctor-clinic day at one availability version token"""
+    return f"{SLOT_CACHE_PREFIX}:{doctor_clinic_id}:{slot_date.isoformat()}:{version}"
+
+
+def _bump(counter):
+    """Count a hit or a miss in this process"""
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+def get_cached_slots(doctor_clinic_id, slot_date, version):
+    """
+    Return the cached day entry or None on a miss.
+    The entry is a list of (start_minutes, slot_duration, slot_count, booked_mask)
+    windows as produced by doctors.slot_bitmap.pack_window().
+    """
+    entry = cache.get(slot_cache_key(doctor_clinic_id, slot_date, version))
+    _bump("hits" if entry is not None else "misses")
+    return entry
+
+
+def set_cached_slots(doctor_clinic_id, slot_date, version, windows):
+    """Store the packed availability windows of a day, read at the given version"""
+    cache.set(
+        slot_cache_key(doctor_clinic_id, slot_date, version),
+        [tuple(window) for window in windows],
+        timeout=SLOT_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_slots(doctor_clinic_id, slot_date):
+    """Give a day a new availability version (and cache key) once the current transaction commits"""
+    bump_version("availability", doctor_clinic_id, slot_date)
+    logger.debug(f"Slot cache invalidated: {doctor_clinic_id} {slot_date}")
+
+
+def invalidate_slot_days(doctor_clinic_id, slot_dates):
+    """Invalidate many days of one doctor-clinic in one call"""
+    for slot_date in slot_dates:
+        bump_version("availability", doctor_clinic_id, slot_date)
+
+
+def slot_cache_stats():
+    """Return this worker's hit/miss counters and the resulting hit rate"""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+    }
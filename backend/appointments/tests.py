@@ -1,3 +1,104 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, tag
+
+from clinic.models import Clinic
+from doctors.models import DoctorProfile
+from patients.models import PatientProfile
+from users.models import User
+
+EXPLAIN_ROWS = 1_000_000
+EXPLAIN_DOCTORS = 100
+EXPLAIN_PATIENTS = 100
+EXPLAIN_START = datetime(2030, 1, 6, tzinfo=dt_timezone.utc)
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@tag("slow")
+class AppointmentIndexPlanTests(TestCase):
+    """The hot appointment predicates are index scans on a 1M-row table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clinic = Clinic.objects.create(name="Plan Clinic", address="", phone="", email="plan@example.com")
+        doctor_users = User.objects.bulk_create([
+            User(email=f"plan-doctor{n}@example.com", role="doctor") for n in range(EXPLAIN_DOCTORS)
+        ])
+        patient_users = User.objects.bulk_create([
+            User(email=f"plan-patient{n}@example.com", role="patient") for n in range(EXPLAIN_PATIENTS)
+        ])
+        doctor_ids = [d.id for d in DoctorProfile.objects.bulk_create([DoctorProfile(user=u) for u in doctor_users])]
+        patient_ids = [p.id for p in PatientProfile.objects.bulk_create([PatientProfile(user=u) for u in patient_users])]
+        cls.doctor_id, cls.patient_id = doctor_ids[0], patient_ids[0]
+
+        with connection.cursor() as cursor:
+            # Every doctor gets a 30-minute slot after slot, one in ten cancelled
+            cursor.execute("""
+                INSERT INTO appointments_appointment
+                (doctor_id, clinic_id, patient_id, scheduled_time, status, notes, created_at)
+                SELECT
+                    (%s::bigint[])[1 + n %% %s],
+                    %s,
+                    (%s::bigint[])[1 + (n / %s) %% %s],
+                    %s + make_interval(mins => 30 * (n / %s)),
+                    CASE WHEN n %% 10 = 0 THEN 'cancelled' ELSE 'booked' END,
+                    '',
+                    NOW()
+                FROM generate_series(0, %s - 1) AS n
+            """, [
+                doctor_ids, EXPLAIN_DOCTORS, cls.clinic.id,
+                patient_ids, EXPLAIN_DOCTORS, EXPLAIN_PATIENTS,
+                EXPLAIN_START, EXPLAIN_DOCTORS, EXPLAIN_ROWS,
+            ])
+            cursor.execute("ANALYZE appointments_appointment")
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return list(plan_nodes(plan[0]["Plan"]))
+
+    def assertIndexScan(self, sql, params):
+        nodes = [node for node in self.explain(sql, params) if node.get("Relation Name") == "appointments_appointment"]
+        self.assertTrue(nodes, "appointments_appointment is not in the plan")
+        for node in nodes:
+            self.assertIn("Index", node["Node Type"], f"Expected an index scan, got {node['Node Type']}")
+
+    def test_doctor_day_conflict_check(self):
+        day = EXPLAIN_START + timedelta(days=30)
+        self.assertIndexScan("""
+            SELECT COUNT(*) FROM appointments_appointment
+            WHERE doctor_id = %s
+              AND scheduled_time >= %s
+              AND scheduled_time < %s
+              AND status != 'cancelled'
+        """, [self.doctor_id, day, day + timedelta(hours=8)])
+
+    def test_booked_slots_of_a_day(self):
+        day = EXPLAIN_START + timedelta(days=30)
+        self.assertIndexScan("""
+            SELECT scheduled_time FROM appointments_appointment
+            WHERE doctor_id = %s
+              AND clinic_id = %s
+              AND scheduled_time >= %s
+              AND scheduled_time < %s
+              AND status IN ('booked', 'rescheduled')
+        """, [self.doctor_id, self.clinic.id, day, day + timedelta(days=1)])
+
+    def test_patient_upcoming_page(self):
+        self.assertIndexScan("""
+            SELECT id, scheduled_time FROM appointments_appointment
+            WHERE patient_id = %s
+              AND scheduled_time >= %s
+            ORDER BY scheduled_time, id
+            LIMIT 50
+        """, [self.patient_id, EXPLAIN_START + timedelta(days=60)])
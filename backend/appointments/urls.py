@@ -0,0 +1,7 @@
+# appointments/urls.py
+from django.urls import path
+from .views import AppointmentTimelineView
+
+urlpatterns = [
+    path('timeline/', AppointmentTimelineView.as_view(), name='appointment-timeline'),
+]
@@ -1,3 +1,166 @@
-from django.shortcuts import render
+# appointments/views.py
+from django.db import connection
+from rest_framework.response import Response
+from rest_framework import permissions
+from rest_framework.views import APIView
+from datetime import datetime, timedelta, time, timezone as dt_timezone
+from appointments.models import Appointment
+from appointments.serializers import TimelineEntrySerializer
+from backend.pagination import (
+    InvalidPageRequest,
+    decode_cursor,
+    fetch_limit,
+    get_page_size,
+    paginate,
+    paginated_response,
+)
 
-# Create your views here.
+
+def dictfetchall(cursor):
+    """Return all rows from a cursor as a dict"""
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+# Profile table and appointment column of each role that has a timeline
+TIMELINE_OWNERS = {
+    "doctor": ("doctors_doctorprofile", "doctor_id"),
+    "patient": ("patients_patientprofile", "patient_id"),
+}
+
+TIMELINE_STATUSES = {value for value, _ in Appointment.STATUS_CHOICES}
+
+
+class AppointmentTimelineView(APIView):
+    """
+    Upcoming and archived appointments of the current doctor or patient as
+    one ordered, keyset-paginated list
+
+    Query Parameters:
+    - start_date, end_date: YYYY-MM-DD, inclusive bounds on scheduled_time
+    - status: Comma-separated statuses, e.g. booked,completed
+    - order: desc (newest first, default) or asc
+    - page_size, cursor: Keyset pagination (next cursor in X-Next-Cursor)
+
+    Each entry carries source = "live" (appointments_appointment) or
+    "archived" (appointments_pastappointment).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        owner = TIMELINE_OWNERS.get(request.user.role)
+        if owner is None:
+            return Response({"detail": "Only doctors and patients have a timeline."}, status=400)
+        profile_table, owner_column = owner
+
+        try:
+            start_date = request.query_params.get("start_date")
+            end_date = request.query_params.get("end_date")
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=400)
+
+        statuses = [value.strip() for value in request.query_params.get("status", "").split(",") if value.strip()]
+        if set(statuses) - TIMELINE_STATUSES:
+            return Response({"error": f"status must be among: {', '.join(sorted(TIMELINE_STATUSES))}"}, status=400)
+
+        order = request.query_params.get("order", "desc").lower()
+        if order not in ("asc", "desc"):
+            return Response({"error": "order must be asc or desc."}, status=400)
+
+        try:
+            # Always paged: an unbounded merge would walk the whole archive
+            page_size = get_page_size(request, paginate_by_default=True)
+            after = decode_cursor(request, (datetime, int))
+        except InvalidPageRequest as e:
+            return Response({"error": str(e)}, status=400)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {profile_table} WHERE user_id = %s", [request.user.id])
+            profile_row = cursor.fetchone()
+            if not profile_row:
+                return Response({"detail": f"User has no {request.user.role} profile."}, status=400)
+
+            direction = order.upper()
+            comparison = "<" if order == "desc" else ">"
+
+            def branch(table, alias, naive):
+                """One side of the merge: the owner's rows in keyset order, at most a page"""
+                # appointments_pastappointment stores naive UTC timestamps
+                bound = "(%s AT TIME ZONE 'UTC')" if naive else "%s"
+                as_utc = " AT TIME ZONE 'UTC'" if naive else ""
+                source = "archived" if naive else "live"
+                completed_at = f"{alias}.completed_at AT TIME ZONE 'UTC'" if naive else "NULL::timestamptz"
+
+                filters = [f"{alias}.{owner_column} = %s"]
+                params = [profile_row[0]]
+                if start_date:
+                    filters.append(f"{alias}.scheduled_time >= {bound}")
+                    params.append(datetime.combine(start_date, time.min, tzinfo=dt_timezone.utc))
+                if end_date:
+                    filters.append(f"{alias}.scheduled_time < {bound}")
+                    params.append(datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=dt_timezone.utc))
+                if statuses:
+                    filters.append(f"{alias}.status = ANY(%s)")
+                    params.append(statuses)
+                if after:
+                    # The plain range predicate also prunes archive partitions
+                    filters.append(f"{alias}.scheduled_time {comparison}= {bound}")
+                    filters.append(f"({alias}.scheduled_time, {alias}.id) {comparison} ({bound}, %s)")
+                    params.extend([after[0], after[0], after[1]])
+
+                sql = f"""
+                    (
+                        SELECT
+                            '{source}' AS source,
+                            {alias}.id,
+                            {alias}.doctor_id,
+                            {alias}.patient_id,
+                            {alias}.clinic_id,
+                            {alias}.scheduled_time{as_utc} AS scheduled_time,
+                            {alias}.status,
+                            {alias}.notes,
+                            {alias}.created_at{as_utc} AS created_at,
+                            {completed_at} AS completed_at
+                        FROM {table} {alias}
+                        WHERE {" AND ".join(filters)}
+                        ORDER BY {alias}.scheduled_time {direction}, {alias}.id {direction}
+                        LIMIT %s
+                    )
+                """
+                params.append(fetch_limit(page_size))
+                return sql, params
+
+            live_sql, live_params = branch("appointments_appointment", "a", naive=False)
+            archived_sql, archived_params = branch("appointments_pastappointment", "pa", naive=True)
+
+            # Each side returns at most page_size + 1 rows from its index, so the
+            # merge and the name lookups only touch one page
+            cursor.execute(f"""
+                WITH timeline AS (
+                    SELECT * FROM ({live_sql} UNION ALL {archived_sql}) merged
+                    ORDER BY scheduled_time {direction}, id {direction}
+                    LIMIT %s
+                )
+                SELECT
+                    t.*,
+                    CONCAT(du.first_name, ' ', du.last_name) AS doctor_name,
+                    CONCAT(pu.first_name, ' ', pu.last_name) AS patient_name,
+                    c.name AS clinic_name
+                FROM timeline t
+                INNER JOIN doctors_doctorprofile dp ON t.doctor_id = dp.id
+                INNER JOIN users_user du ON dp.user_id = du.id
+                INNER JOIN patients_patientprofile pp ON t.patient_id = pp.id
+                INNER JOIN users_user pu ON pp.user_id = pu.id
+                INNER JOIN clinic_clinic c ON t.clinic_id = c.id
+                ORDER BY t.scheduled_time {direction}, t.id {direction}
+            """, live_params + archived_params + [fetch_limit(page_size)])
+
+            entries, next_cursor = paginate(
+                dictfetchall(cursor), page_size,
+                lambda row: (row['scheduled_time'], row['id'])
+            )
+
+        serializer = TimelineEntrySerializer(entries, many=True)
+        return paginated_response(serializer.data, next_cursor)
@@ -0,0 +1,25 @@
+# backend/backend/checks.py
+"""
+System checks for settings the caching layers depend on
+Slot caches, ETag version stamps and the clinic catalog are invalidated
+through Django's cache, so the cache must be shared by all workers.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"CACHES['default'] uses {backend}, which is not shared between worker processes.",
+            hint="Use Redis (set REDIS_URL) or django.core.cache.backends.db.DatabaseCache.",
+            id='backend.E001',
+        )]
+    return []
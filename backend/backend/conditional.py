@@ -0,0 +1,131 @@
+# backend/backend/conditional.py
+"""
+Conditional GET support
+Each cacheable resource has a version stamp in the shared cache: a random
+token plus the time of the last change. Writers call bump_version() for
+the resources they touched; readers answer If-None-Match /
+If-Modified-Since from the stamp alone, so an unchanged resource is a 304
+without running its queries or serializers. A lost stamp just means a
+new token and one full response.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+import hashlib
+import secrets
+import time
+
+VERSION_PREFIX = "version"
+
+
+def _version_key(parts):
+    return VERSION_PREFIX + ":" + ":".join(str(part) for part in parts)
+
+
+def _new_token():
+    return secrets.token_hex(8)
+
+
+def get_version(*parts):
+    """
+    Return the (token, modified_at) stamp of a resource.
+
+    Args:
+        parts: Resource key parts, e.g. ("doctor", 12)
+
+    Returns:
+        (token, modified_at as a Unix timestamp); a stamp is created on first use
+    """
+    key = _version_key(parts)
+    stamp = cache.get(key)
+    now = time.time()
+
+    if stamp is not None and stamp[2] and stamp[2][0] <= now:
+        # A scheduled change (e.g. a slot hold expiring) has happened
+        lapsed = [at for at in stamp[2] if at <= now]
+        stamp = (_new_token(), lapsed[-1], tuple(at for at in stamp[2] if at > now))
+        cache.set(key, stamp, timeout=None)
+
+    if stamp is None:
+        cache.add(key, (_new_token(), now, ()), timeout=None)
+        stamp = cache.get(key) or (_new_token(), now, ())
+
+    return stamp[0], stamp[1]
+
+
+def bump_version(*parts, expires_in=None):
+    """
+    Give a resource a new version once the current transaction commits.
+
+    Args:
+        parts: Resource key parts
+        expires_in: Seconds until the change lapses on its own (e.g. a slot
+            hold); the resource gets another new version at that moment
+    """
+    key = _version_key(parts)
+
+    def bump():
+        now = time.time()
+        old = cache.get(key)
+        lapses = [at for at in (old[2] if old else ()) if at > now]
+        if expires_in:
+            lapses.append(now + expires_in)
+        cache.set(key, (_new_token(), now, tuple(sorted(lapses))), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def _etag(token, vary):
+    if not vary:
+        return f'"{token}"'
+    digest = hashlib.blake2s(
+        "|".join([token] + [str(value) for value in vary]).encode(), digest_size=8
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _not_modified(request, etag, modified_at):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if modified_at is not None:
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        return since is not None and int(modified_at) <= since
+
+    return False
+
+
+def conditional_response(request, parts, build, vary=()):
+    """
+    Answer a GET with 304 when the client's copy of the resource is current.
+
+    Args:
+        request: The DRF request
+        parts: Resource key parts of the version stamp
+        build: Callable taking the (token, modified_at) stamp and producing
+            the full Response; only called when needed. The stamp is read
+            once per request, so builders reuse it instead of calling
+            get_version() again
+        vary: Extra values the body depends on besides the stored data
+            (user, day, ...); folded into the ETag, and Last-Modified is
+            omitted because the stamp time alone no longer describes the body
+
+    Returns:
+        The 304 or the built Response, with ETag (and Last-Modified) set
+    """
+    token, modified_at = get_version(*parts)
+    headers = {"ETag": _etag(token, vary), "Cache-Control": "private, no-cache"}
+    if not vary:
+        headers["Last-Modified"] = http_date(modified_at)
+
+    if _not_modified(request, headers["ETag"], None if vary else modified_at):
+        return Response(status=304, headers=headers)
+
+    response = build((token, modified_at))
+    if response.status_code == 200:
+        for header, value in headers.items():
+            response[header] = value
+    return response
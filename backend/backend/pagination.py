@@ -0,0 +1,112 @@
+# backend/backend/pagination.py
+"""
+Keyset (cursor) pagination helpers
+List endpoints fetch page_size + 1 rows after the position encoded in an
+opaque ?cursor= token (the sort key plus id of the last row served), so
+every page costs the same no matter how deep the client scrolls.
+Response bodies keep their shape; the next page's cursor is returned in
+the X-Next-Cursor header and is absent on the last page.
+Pagination is opt-in on the endpoints that predate it: without ?page_size=
+or ?cursor= they still return every row, as clients that never read the
+header expect.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework.response import Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidPageRequest(ValueError):
+    """Raised for a malformed cursor or page_size"""
+
+
+def get_page_size(request, paginate_by_default=False):
+    """
+    Return ?page_size= clamped to API_MAX_PAGE_SIZE, or API_PAGE_SIZE.
+
+    Returns None (every row, no cursor) when the request sends neither
+    page_size nor cursor, unless paginate_by_default is set.
+    """
+    default = getattr(settings, "API_PAGE_SIZE", 50)
+    maximum = getattr(settings, "API_MAX_PAGE_SIZE", 200)
+
+    raw = request.query_params.get("page_size")
+    if not raw:
+        if paginate_by_default or request.query_params.get("cursor"):
+            return default
+        return None
+    try:
+        return min(max(int(raw), 1), maximum)
+    except ValueError:
+        raise InvalidPageRequest("page_size must be an integer.")
+
+
+def fetch_limit(page_size):
+    """LIMIT for one page plus the row telling whether another follows; None (LIMIT NULL) for all rows"""
+    return None if page_size is None else page_size + 1
+
+
+def encode_cursor(values):
+    """Encode the sort key values of a row as an opaque token"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(request, types):
+    """
+    Decode ?cursor= into a list of values converted with the given types.
+
+    Args:
+        request: The DRF request
+        types: One type per sort key column, e.g. (datetime, int)
+
+    Returns:
+        List of values, or None when no cursor was sent
+
+    Raises:
+        InvalidPageRequest: If the token is malformed
+    """
+    token = request.query_params.get("cursor")
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+            for value, value_type in zip(values, types)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidPageRequest("Invalid cursor.")
+
+
+def paginate(rows, page_size, key):
+    """
+    Trim page_size + 1 fetched rows to one page.
+
+    Args:
+        rows: Rows fetched with LIMIT page_size + 1
+        page_size: Rows per page, or None when unpaginated
+        key: Function returning the sort key values of a row
+
+    Returns:
+        (page rows, next cursor or None)
+    """
+    if page_size is not None and len(rows) > page_size:
+        page = rows[:page_size]
+        return page, encode_cursor(key(page[-1]))
+    return rows, None
+
+
+def paginated_response(data, next_cursor, **kwargs):
+    """Response carrying the next page's cursor in the X-Next-Cursor header"""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(data, headers=headers, **kwargs)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -164,6 +165,8 @@ CORS_ALLOW_HEADERS = [
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
+    "if-none-match",
+    "if-modified-since",
 ]
 
 CORS_ALLOW_METHODS = [
@@ -174,6 +177,9 @@ CORS_ALLOW_METHODS = [
     "POST",
     "PUT",
 ]
+
+# Lets the frontend read the keyset pagination cursor and conditional GET validators
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor", "ETag"]
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -202,6 +208,59 @@ EMAIL_HOST_USER = 'your-email@gmail.com'
 EMAIL_HOST_PASSWORD = 'your-app-password'
 DEFAULT_FROM_EMAIL = 'Medicare <noreply@medicare.com>'
 
+# Email outbox dispatcher (python manage.py dispatch_emails). For a local SMTP
+# stand-in, run `python -m aiosmtpd -n -l localhost:1025` and point the smtp
+# backend at it with EMAIL_HOST = 'localhost', EMAIL_PORT = 1025, EMAIL_USE_TLS = False
+# (bench_email_delivery --serve measures pooled throughput against such a sink).
+# WORKERS is also the number of SMTP connections each dispatcher keeps open.
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 200,
+    'WORKERS': 4,
+    'MAX_ATTEMPTS': 5,
+    'LEASE_SECONDS': 300,
+    'RETRY_BASE_SECONDS': 30,
+    'RETRY_MAX_SECONDS': 3600,
+}
+
+# CACHE CONFIGURATION (slot availability cache, ETag version stamps, clinic catalog)
+# Must be shared by every worker process, or an invalidation in one worker
+# never reaches the others (backend.checks rejects process-local backends).
+# Redis when REDIS_URL is set, otherwise a table in the main database
+# (created by the appointments 0012_cache_table migration). The database
+# cache only keeps invalidation correct across workers; every lookup is a
+# query, so production should set REDIS_URL.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'medicare_cache',
+        }
+    }
+
+# How long a patient's slot hold lasts before other patients can take the slot
+SLOT_HOLD_TTL_MINUTES = 5
+# At most this many live holds per patient, and no hold renewed past this many minutes
+SLOT_HOLD_MAX_ACTIVE_PER_PATIENT = 3
+SLOT_HOLD_MAX_TOTAL_MINUTES = 15
+
+# Keyset pagination of list endpoints, opt-in via ?page_size= or ?cursor=
+# (?page_size= is clamped to the maximum)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Seconds before a worker fully reloads its in-process doctor directory
+DOCTOR_DIRECTORY_MAX_AGE = 300
+
+# Days ahead searched for each doctor-clinic's next free slot
+NEXT_FREE_SLOT_HORIZON_DAYS = 60
+
 # ✅ ADD LOGGING CONFIGURATION
 LOGGING = {
     'version': 1,
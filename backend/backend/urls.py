@@ -22,5 +22,7 @@ urlpatterns = [
     path("api/auth/", include("users.urls")),
     path("api/doctors/", include("doctors.urls")),
     path("api/patient/", include("patients.urls")),
+    path("api/clinics/", include("clinic.urls")),
+    path("api/appointments/", include("appointments.urls")),
     path("api/notifications/", include("notifications.urls")),  # ✅ ADD THIS
 ]
\ No newline at end of file
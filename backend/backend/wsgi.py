@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load the doctor directory before the worker takes traffic
+from doctors.directory import warm_directory  # noqa: E402
+from django.db import DatabaseError  # noqa: E402
+
+try:
+    warm_directory()
+except DatabaseError:
+    # e.g. before the first migrate; the first read loads it instead
+    pass
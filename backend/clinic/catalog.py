@@ -0,0 +1,80 @@
+# backend/clinic/catalog.py
+"""
+Clinic catalog snapshot
+The public clinic listing (every clinic with its doctors and their
+specializations) is built by one query and stored in Django's cache as
+ready-to-send JSON, so serving it is a cache read. It is rebuilt after
+commit whenever clinics, doctor-clinic links or doctor names and
+specializations change (see clinic/signals.py and
+doctors.directory.refresh_doctors).
+"""
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from backend.conditional import bump_version
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CACHE_KEY = "clinic:catalog"
+
+CATALOG_SQL = """
+    SELECT
+        c.id,
+        c.name,
+        c.address,
+        c.phone,
+        c.email,
+        COALESCE(d.doctors, '[]'::json) AS doctors,
+        COALESCE(d.specializations, '{}') AS specializations
+    FROM clinic_clinic c
+    LEFT JOIN LATERAL (
+        SELECT
+            json_agg(
+                json_build_object(
+                    'doctor_id', dp.id,
+                    'first_name', u.first_name,
+                    'last_name', u.last_name,
+                    'specialization', dp.specialization,
+                    'consultation_fee', dc.consultation_fee
+                )
+                ORDER BY u.first_name, u.last_name, dp.id
+            ) AS doctors,
+            array_agg(DISTINCT dp.specialization) FILTER (WHERE dp.specialization <> '') AS specializations
+        FROM doctors_doctorclinic dc
+        INNER JOIN doctors_doctorprofile dp ON dc.doctor_id = dp.id
+        INNER JOIN users_user u ON dp.user_id = u.id
+        WHERE dc.clinic_id = c.id
+    ) d ON TRUE
+    ORDER BY c.name, c.id
+"""
+
+
+def build_clinic_catalog():
+    """Query the catalog and store it as encoded JSON; returns the bytes"""
+    with connection.cursor() as cursor:
+        cursor.execute(CATALOG_SQL)
+        columns = [col[0] for col in cursor.description]
+        clinics = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    payload = json.dumps(
+        {"count": len(clinics), "results": clinics}, cls=DjangoJSONEncoder
+    ).encode()
+    cache.set(CATALOG_CACHE_KEY, payload, timeout=None)
+    logger.debug(f"Clinic catalog rebuilt: {len(clinics)} clinics")
+    return payload
+
+
+def get_clinic_catalog():
+    """Return the catalog JSON bytes, building the snapshot if it is missing"""
+    payload = cache.get(CATALOG_CACHE_KEY)
+    if payload is None:
+        payload = build_clinic_catalog()
+    return payload
+
+
+def invalidate_clinic_catalog():
+    """Rebuild the snapshot once the current transaction commits"""
+    transaction.on_commit(build_clinic_catalog)
+    bump_version("clinic-catalog")
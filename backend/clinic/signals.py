@@ -0,0 +1,28 @@
+# backend/clinic/signals.py
+"""
+Keeps the clinic catalog snapshot and the doctor directory current for ORM
+writes (admin edits to clinics or doctor-clinic links). Raw SQL writers
+call invalidate_clinic_catalog() / refresh_doctors() themselves.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from doctors.directory import refresh_doctors
+from doctors.models import DoctorClinic
+from .catalog import invalidate_clinic_catalog
+from .models import Clinic
+
+
+@receiver([post_save, post_delete], sender=Clinic)
+def clinic_changed(sender, instance, **kwargs):
+    # Directory entries carry clinic names; deleted clinics reach the
+    # doctors through the cascaded DoctorClinic deletes below
+    doctor_ids = list(DoctorClinic.objects.filter(clinic_id=instance.pk).values_list("doctor_id", flat=True))
+    if doctor_ids:
+        refresh_doctors(doctor_ids)
+    else:
+        invalidate_clinic_catalog()
+
+
+@receiver([post_save, post_delete], sender=DoctorClinic)
+def doctor_clinic_changed(sender, instance, **kwargs):
+    refresh_doctors([instance.doctor_id])
@@ -0,0 +1,7 @@
+# clinic/urls.py
+from django.urls import path
+from .views import ClinicCatalogView
+
+urlpatterns = [
+    path('', ClinicCatalogView.as_view(), name='clinic-catalog'),
+]
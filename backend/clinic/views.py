@@ -1,3 +1,22 @@
-from django.shortcuts import render
+# clinic/views.py
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.views import APIView
+from backend.conditional import conditional_response
+from clinic.catalog import get_clinic_catalog
 
-# Create your views here.
+
+class ClinicCatalogView(APIView):
+    """
+    Public list of clinics with the doctors at each clinic and their specializations
+    Served from a cached snapshot of pre-encoded JSON (supports conditional GET).
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        return conditional_response(
+            request,
+            ("clinic-catalog",),
+            lambda version: HttpResponse(get_clinic_catalog(), content_type="application/json"),
+        )
@@ -0,0 +1,221 @@
+# backend/doctors/directory.py
+"""
+In-process doctor directory
+The directory (profile, name, specialization, clinics and fees of every
+doctor) changes rarely but is read on every doctor detail call and every
+unfiltered doctor list, so each worker keeps it in memory, together with
+the list in name order. The unfiltered list and its pages (keyset on the
+case-folded name plus id) are served from it without a query. Searches and
+filtered lists do not use it: they filter and sort in Postgres so results,
+collation and cursors match the SQL path. It is warmed when the worker starts (backend/wsgi.py, backend/asgi.py),
+refreshed per doctor once a profile, clinic or clinic link change
+commits, and fully reloaded after roughly DOCTOR_DIRECTORY_MAX_AGE
+seconds (jittered per worker, one reloading thread at a time) so other
+workers converge without reloading in lockstep.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from backend.conditional import bump_version
+from backend.pagination import paginate
+from clinic.catalog import invalidate_clinic_catalog
+from bisect import bisect_right
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Joins a doctor's clinics, as a JSON array ordered by clinic name, onto a
+# query over doctors_doctorprofile dp; select COALESCE(cl.clinics, '[]'::json)
+DOCTOR_CLINICS_LATERAL_SQL = """
+    LEFT JOIN LATERAL (
+        SELECT json_agg(
+            json_build_object(
+                'clinic_id', dc.clinic_id,
+                'clinic_name', c.name,
+                'consultation_fee', dc.consultation_fee
+            )
+            ORDER BY c.name
+        ) AS clinics
+        FROM doctors_doctorclinic dc
+        INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
+        WHERE dc.doctor_id = dp.id
+    ) cl ON TRUE
+"""
+
+DIRECTORY_SQL = """
+    SELECT
+        dp.id,
+        dp.user_id,
+        u.first_name,
+        u.last_name,
+        dp.specialization,
+        dp.qualification,
+        dp.experience_years,
+        COALESCE(cl.clinics, '[]'::json) AS clinics
+    FROM doctors_doctorprofile dp
+    INNER JOIN users_user u ON dp.user_id = u.id
+    """ + DOCTOR_CLINICS_LATERAL_SQL
+
+_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_doctors = {}       # doctor_id -> directory entry
+_ordered = []       # entries in list order
+_ordered_keys = []  # _sort_key() of each entry of _ordered
+_loaded_at = None   # monotonic time of the last full load
+_max_age = None     # this load's jittered lifetime in seconds
+_loaded_wall = None
+_refreshed_wall = None
+_entry_loaded = {}  # doctor_id -> wall time the entry was read from the database
+
+
+def _sort_key(first_name, last_name, doctor_id):
+    return (first_name.casefold(), last_name.casefold(), doctor_id)
+
+
+def _order(doctors):
+    """Return (entries, sort keys) of the doctors in list order"""
+    ordered = sorted(
+        doctors.values(), key=lambda d: _sort_key(d['first_name'], d['last_name'], d['id'])
+    )
+    return ordered, [_sort_key(d['first_name'], d['last_name'], d['id']) for d in ordered]
+
+
+def _fetch(doctor_ids=None):
+    """Load directory entries, for all doctors or only the given ids"""
+    sql = DIRECTORY_SQL
+    params = []
+    if doctor_ids is not None:
+        sql += " WHERE dp.id = ANY(%s)"
+        params.append(list(doctor_ids))
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def warm_directory():
+    """Load the whole directory; returns the number of doctors loaded"""
+    global _doctors, _ordered, _ordered_keys, _loaded_at, _max_age, _loaded_wall, _refreshed_wall, _entry_loaded
+
+    started = time.time()
+    rows = _fetch()
+    doctors = {row['id']: row for row in rows}
+    ordered, ordered_keys = _order(doctors)
+    with _lock:
+        _doctors = doctors
+        _ordered, _ordered_keys = ordered, ordered_keys
+        _entry_loaded = dict.fromkeys(doctors, started)
+        _loaded_at = time.monotonic()
+        _max_age = getattr(settings, "DOCTOR_DIRECTORY_MAX_AGE", 300) * random.uniform(0.75, 1.0)
+        _loaded_wall = _refreshed_wall = started
+
+    logger.info(f"Doctor directory loaded: {len(doctors)} doctors")
+    return len(doctors)
+
+
+def _ensure_fresh():
+    if _loaded_at is None:
+        with _reload_lock:
+            if _loaded_at is None:
+                warm_directory()
+    elif time.monotonic() - _loaded_at > _max_age and _reload_lock.acquire(blocking=False):
+        # Other threads keep serving the current copy meanwhile
+        try:
+            warm_directory()
+        finally:
+            _reload_lock.release()
+
+
+def _reload(doctor_ids):
+    """Re-read some doctors' entries (dropping deleted ones)"""
+    global _doctors, _ordered, _ordered_keys, _refreshed_wall
+
+    started = time.time()
+    rows = {row['id']: row for row in _fetch(doctor_ids)}
+    with _lock:
+        doctors = dict(_doctors)
+        for doctor_id in doctor_ids:
+            if doctor_id in rows:
+                doctors[doctor_id] = rows[doctor_id]
+                _entry_loaded[doctor_id] = started
+            else:
+                doctors.pop(doctor_id, None)
+                _entry_loaded.pop(doctor_id, None)
+        _doctors = doctors
+        _ordered, _ordered_keys = _order(doctors)
+        _refreshed_wall = started
+    logger.debug(f"Doctor directory refreshed: {doctor_ids}")
+
+
+def refresh_doctors(doctor_ids):
+    """Reload the given doctors' entries once the current transaction commits"""
+    doctor_ids = list(doctor_ids)
+
+    def reload():
+        if _loaded_at is None:
+            # Not warmed yet; the first read loads everything anyway
+            return
+        _reload(doctor_ids)
+
+    for doctor_id in doctor_ids:
+        bump_version("doctor", doctor_id)
+    # Clinic listings show doctor names, specializations and fees too
+    invalidate_clinic_catalog()
+    transaction.on_commit(reload)
+
+
+def get_doctor(doctor_id, changed_at=None):
+    """
+    Return one directory entry, or None if there is no such doctor.
+
+    Args:
+        doctor_id: The doctor profile id
+        changed_at: Unix time of the doctor's last known change (e.g. from
+            another worker); an entry read before it is reloaded first
+    """
+    _ensure_fresh()
+    if changed_at is not None and _entry_loaded.get(doctor_id, 0) < changed_at:
+        _reload([doctor_id])
+    return _doctors.get(doctor_id)
+
+
+def list_doctors(after=None, page_size=None):
+    """
+    Return one page of the unfiltered doctor list, in name order.
+
+    Args:
+        after: Decoded cursor (first_name, last_name, id) of the last doctor served
+        page_size: Doctors per page, or None for all of them
+
+    Returns:
+        (page, next cursor or None, total number of doctors)
+    """
+    _ensure_fresh()
+    with _lock:
+        ordered, ordered_keys = _ordered, _ordered_keys
+
+    start = bisect_right(ordered_keys, _sort_key(*after)) if after else 0
+    end = None if page_size is None else start + page_size + 1
+    page, next_cursor = paginate(
+        ordered[start:end], page_size,
+        lambda row: (row['first_name'], row['last_name'], row['id'])
+    )
+    return page, next_cursor, len(ordered)
+
+
+def directory_stats():
+    """Return the directory size and how stale it is"""
+    now = time.time()
+    max_age = getattr(settings, "DOCTOR_DIRECTORY_MAX_AGE", 300)
+    age = round(now - _loaded_wall, 3) if _loaded_wall is not None else None
+    return {
+        "size": len(_doctors),
+        "loaded": _loaded_at is not None,
+        "loaded_seconds_ago": age,
+        "refreshed_seconds_ago": round(now - _refreshed_wall, 3) if _refreshed_wall is not None else None,
+        "max_age_seconds": max_age,
+        "stale": age is None or age > max_age,
+    }
@@ -0,0 +1,76 @@
+# backend/doctors/management/commands/bench_slot_bitmap.py
+import random
+import timeit
+from datetime import datetime, date, time, timedelta
+
+from django.core.management.base import BaseCommand
+from doctors.slot_bitmap import window_slot_count, summarize_windows
+
+
+def legacy_summary(slot_date, start_time, end_time, slot_duration, booked_times):
+    """The pre-bitmap code path: datetime loop, strftime per slot, string set lookup"""
+    current = datetime.combine(slot_date, start_time)
+    end_dt = datetime.combine(slot_date, end_time)
+    delta = timedelta(minutes=slot_duration)
+
+    all_slots = []
+    while current < end_dt:
+        all_slots.append(current.strftime("%H:%M"))
+        current += delta
+
+    booked_set = {booked.strftime("%H:%M") for booked in booked_times}
+    free_slots = [slot for slot in all_slots if slot not in booked_set]
+    return {
+        "slots": free_slots,
+        "total_slots": len(all_slots),
+        "available_slots": len(free_slots),
+        "booked_slots": len(booked_set),
+    }
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the slot bitmap summary against the string-based slot path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument("--slot-duration", type=int, default=10)
+        parser.add_argument("--booked-ratio", type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        slot_duration = options["slot_duration"]
+        slot_date = date.today() + timedelta(days=1)
+        start_time, end_time = time(8, 0), time(20, 0)
+
+        slot_count = window_slot_count(start_time, end_time, slot_duration)
+        rng = random.Random(42)
+        booked_indexes = [i for i in range(slot_count) if rng.random() < options["booked_ratio"]]
+
+        booked_times = [
+            datetime.combine(slot_date, start_time) + timedelta(minutes=i * slot_duration)
+            for i in booked_indexes
+        ]
+        booked_mask = 0
+        for i in booked_indexes:
+            booked_mask |= 1 << i
+        windows = [(start_time.hour * 60 + start_time.minute, slot_duration, slot_count, booked_mask)]
+
+        legacy = legacy_summary(slot_date, start_time, end_time, slot_duration, booked_times)
+        bitmap = summarize_windows(windows, slot_date)
+        if legacy != {key: bitmap[key] for key in legacy}:
+            self.stderr.write(self.style.ERROR("Bitmap summary does not match the legacy path"))
+            return
+
+        legacy_seconds = timeit.timeit(
+            lambda: legacy_summary(slot_date, start_time, end_time, slot_duration, booked_times),
+            number=iterations,
+        )
+        bitmap_seconds = timeit.timeit(
+            lambda: summarize_windows(windows, slot_date),
+            number=iterations,
+        )
+
+        self.stdout.write(f"{slot_count} slots/day, {len(booked_indexes)} booked, {iterations} iterations")
+        self.stdout.write(f"legacy: {legacy_seconds / iterations * 1e6:8.2f} us/day")
+        self.stdout.write(f"bitmap: {bitmap_seconds / iterations * 1e6:8.2f} us/day")
+        self.stdout.write(self.style.SUCCESS(f"speedup: {legacy_seconds / bitmap_seconds:.1f}x"))
@@ -0,0 +1,18 @@
+# backend/doctors/management/commands/refresh_next_slots.py
+from django.core.management.base import BaseCommand
+from doctors.next_slot import refresh_next_free_slots
+
+
+class Command(BaseCommand):
+    help = "Recompute the next free slot of every doctor-clinic (run periodically, e.g. every few minutes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only refresh doctor-clinics whose stored next slot has already started",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_next_free_slots(stale_only=options["stale_only"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} doctor-clinic(s)"))
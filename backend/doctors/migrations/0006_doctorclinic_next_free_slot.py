@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0005_doctoravailabilitytemplate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctorclinic',
+            name='next_free_slot',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
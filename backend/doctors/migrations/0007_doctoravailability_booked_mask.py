@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0006_doctorclinic_next_free_slot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctoravailability',
+            name='booked_mask',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
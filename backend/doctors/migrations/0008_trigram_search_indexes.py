@@ -0,0 +1,42 @@
+# doctors/migrations/0008_trigram_search_indexes.py
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0001_initial'),
+        ('users', '0001_initial'),
+        ('doctors', '0007_doctoravailability_booked_mask'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            reverse_sql=migrations.RunSQL.noop
+        ),
+
+        # Trigram GIN indexes serve both the fuzzy ranked search (q=) and the
+        # existing ILIKE '%x%' filters, which otherwise scan whole tables
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX IF NOT EXISTS idx_user_first_name_trgm
+                ON users_user USING gin (first_name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS idx_user_last_name_trgm
+                ON users_user USING gin (last_name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS idx_user_full_name_trgm
+                ON users_user USING gin ((first_name || ' ' || last_name) gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS idx_doctor_specialization_trgm
+                ON doctors_doctorprofile USING gin (specialization gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS idx_clinic_name_trgm
+                ON clinic_clinic USING gin (name gin_trgm_ops);
+            """,
+            reverse_sql="""
+            DROP INDEX IF EXISTS idx_user_first_name_trgm;
+            DROP INDEX IF EXISTS idx_user_last_name_trgm;
+            DROP INDEX IF EXISTS idx_user_full_name_trgm;
+            DROP INDEX IF EXISTS idx_doctor_specialization_trgm;
+            DROP INDEX IF EXISTS idx_clinic_name_trgm;
+            """
+        ),
+    ]
@@ -21,6 +21,8 @@ class DoctorClinic(models.Model):
     doctor = models.ForeignKey("DoctorProfile", on_delete=models.CASCADE)
     clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE)
     consultation_fee = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Earliest unbooked future slot, maintained by doctors.next_slot
+    next_free_slot = models.DateTimeField(null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -38,6 +40,8 @@ class DoctorAvailability(models.Model):
     end_time = models.TimeField()
     slot_duration = models.IntegerField(default=30)  
     is_available = models.BooleanField(default=True)
+    # One bit per slot, set while the slot holds an active appointment (see doctors.slot_bitmap)
+    booked_mask = models.BinaryField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -45,3 +49,28 @@ class DoctorAvailability(models.Model):
 
     def __str__(self):
         return f"{self.doctor_clinic.doctor} - {self.date} ({self.start_time}-{self.end_time})"
+
+
+class DoctorAvailabilityTemplate(models.Model):
+    """Recurring weekly availability, expanded into DoctorAvailability rows"""
+    WEEKDAY_CHOICES = [
+        (0, "Monday"),
+        (1, "Tuesday"),
+        (2, "Wednesday"),
+        (3, "Thursday"),
+        (4, "Friday"),
+        (5, "Saturday"),
+        (6, "Sunday"),
+    ]
+
+    doctor_clinic = models.ForeignKey(DoctorClinic, on_delete=models.CASCADE)
+    weekday = models.IntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_duration = models.IntegerField(default=30)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.doctor_clinic.doctor} - {self.get_weekday_display()} ({self.start_time}-{self.end_time})"
@@ -0,0 +1,92 @@
+# backend/doctors/next_slot.py
+"""
+Next free slot index
+Keeps doctors_doctorclinic.next_free_slot pointing at the earliest unbooked
+future slot of each doctor-clinic, so "next available" searches are one
+indexed scan instead of an availability lookup per doctor per day. Only
+the next NEXT_FREE_SLOT_HORIZON_DAYS are searched; a doctor-clinic with no
+free slot in that horizon has none.
+"""
+from django.conf import settings
+from django.db import connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Rows to refresh are locked in id order first, so concurrent refreshes of
+# overlapping sets queue instead of deadlocking. {conditions} filters d.
+# doctorclinic_next_free_slot() (appointments 0015) reads booked_mask and
+# stops at the first free slot, so the lock is held only for a short walk.
+REFRESH_NEXT_FREE_SLOT_SQL = """
+    WITH locked AS (
+        SELECT d.id FROM doctors_doctorclinic d
+        WHERE {conditions}
+        ORDER BY d.id
+        {limit}
+        FOR UPDATE
+    )
+    UPDATE doctors_doctorclinic dc
+    SET next_free_slot = doctorclinic_next_free_slot(dc.id, %s)
+    FROM locked
+    WHERE dc.id = locked.id
+    RETURNING dc.id
+"""
+
+REFRESH_BATCH_SIZE = 500
+
+
+def _refresh(cursor, conditions, params, limit=None):
+    """Run one refresh statement; returns the refreshed ids"""
+    sql = REFRESH_NEXT_FREE_SLOT_SQL.format(
+        conditions=" AND ".join(conditions) or "TRUE",
+        limit="LIMIT %s" if limit else "",
+    )
+    horizon = getattr(settings, "NEXT_FREE_SLOT_HORIZON_DAYS", 60)
+    cursor.execute(sql, params + ([limit] if limit else []) + [horizon])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def refresh_next_free_slots(doctor_clinic_ids=None, stale_only=False):
+    """
+    Recompute next_free_slot from the booked bitmaps, looking at most
+    NEXT_FREE_SLOT_HORIZON_DAYS ahead. Slots with a live hold are skipped;
+    reap_slot_holds refreshes them again once their hold expires.
+
+    Args:
+        doctor_clinic_ids: Only refresh these doctor-clinic rows (one
+            statement); without them every row is refreshed in batches of
+            REFRESH_BATCH_SIZE, each locking only its own rows
+        stale_only: Only refresh rows whose stored slot has already started
+
+    Returns:
+        Number of doctor-clinic rows refreshed
+    """
+    conditions = []
+    params = []
+
+    if doctor_clinic_ids is not None:
+        if not doctor_clinic_ids:
+            return 0
+        conditions.append("d.id = ANY(%s)")
+        params.append([int(dc_id) for dc_id in doctor_clinic_ids])
+
+    if stale_only:
+        conditions.append("d.next_free_slot <= NOW()")
+
+    refreshed = 0
+    with connection.cursor() as cursor:
+        if doctor_clinic_ids is not None:
+            refreshed = len(_refresh(cursor, conditions, params))
+        else:
+            last_id = 0
+            while True:
+                # Outside a transaction each batch commits and releases its locks
+                ids = _refresh(cursor, conditions + ["d.id > %s"], params + [last_id], REFRESH_BATCH_SIZE)
+                refreshed += len(ids)
+                if len(ids) < REFRESH_BATCH_SIZE:
+                    break
+                last_id = max(ids)
+
+    logger.debug(f"Refreshed next free slot for {refreshed} doctor-clinic(s)")
+    return refreshed
@@ -25,6 +25,19 @@ class DoctorAvailabilitySerializer(serializers.Serializer):
     slot_duration = serializers.IntegerField()
 
 
+class DoctorAvailabilityTemplateSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    doctor_clinic_id = serializers.IntegerField()
+    clinic_name = serializers.CharField(read_only=True)
+    weekday = serializers.IntegerField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    slot_duration = serializers.IntegerField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    created_at = serializers.DateTimeField(read_only=True)
+
+
 class ClinicSimpleSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
@@ -0,0 +1,106 @@
+# backend/doctors/slot_bitmap.py
+"""
+Slot bitmaps
+Each DoctorAvailability row carries booked_mask, one bit per slot of the
+window (bit i = slot i, least significant bit first, as written by
+Postgres set_bit()). The mask is kept in step with appointments by the
+triggers in appointments/migrations/0006_availability_booked_mask.py, so
+free slots and counts are bit operations instead of per-slot strings.
+"""
+
+
+def window_slot_count(start_time, end_time, slot_duration):
+    """Number of slots that start inside [start_time, end_time)"""
+    start_minutes = start_time.hour * 60 + start_time.minute
+    end_minutes = end_time.hour * 60 + end_time.minute
+    span = end_minutes - start_minutes
+    if span <= 0:
+        return 0
+    return -(-span // slot_duration)
+
+
+def mask_from_bytes(raw):
+    """Decode a bytea booked_mask into an int (None means nothing booked)"""
+    if not raw:
+        return 0
+    return int.from_bytes(bytes(raw), "little")
+
+
+def pack_window(row):
+    """Reduce an availability row to the (start_minutes, slot_duration, slot_count, booked_mask) tuple"""
+    start_time = row['start_time']
+    return (
+        start_time.hour * 60 + start_time.minute,
+        row['slot_duration'],
+        window_slot_count(start_time, row['end_time'], row['slot_duration']),
+        mask_from_bytes(row['booked_mask']),
+    )
+
+
+def _label(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def held_mask(start_minutes, slot_duration, slot_count, held_minutes):
+    """Bitmap of the window's slots whose start (minutes after midnight) is in held_minutes"""
+    mask = 0
+    for minutes in held_minutes:
+        offset = minutes - start_minutes
+        if offset >= 0 and offset % slot_duration == 0 and offset // slot_duration < slot_count:
+            mask |= 1 << (offset // slot_duration)
+    return mask
+
+
+def summarize_windows(windows, slot_date, now=None, held_minutes=()):
+    """
+    Compute free slots and counts for one day from packed windows.
+
+    Args:
+        windows: Iterable of (start_minutes, slot_duration, slot_count, booked_mask)
+        slot_date: The day the windows belong to
+        now: Current datetime; slots that already started today are excluded
+        held_minutes: Slot starts (minutes after midnight) held by other patients
+
+    Returns:
+        Dict with slots (free "HH:MM" labels), total_slots, available_slots,
+        booked_slots and held_slots
+    """
+    now_seconds = None
+    if now is not None and slot_date == now.date():
+        now_seconds = now.hour * 3600 + now.minute * 60 + now.second + (1 if now.microsecond else 0)
+
+    slots = []
+    total = available = booked = held = 0
+
+    for start_minutes, slot_duration, slot_count, booked_mask in windows:
+        full_mask = (1 << slot_count) - 1
+        booked_mask &= full_mask
+
+        if now_seconds is not None and now_seconds >= start_minutes * 60:
+            # Slot i is in the future when (start + i * duration) minutes is after now
+            first_future = (now_seconds - start_minutes * 60) // (slot_duration * 60) + 1
+            full_mask &= ~((1 << first_future) - 1)
+
+        window_held = 0
+        if held_minutes:
+            window_held = held_mask(start_minutes, slot_duration, slot_count, held_minutes) & ~booked_mask
+
+        free_mask = full_mask & ~booked_mask & ~window_held
+        total += full_mask.bit_count()
+        available += free_mask.bit_count()
+        booked += booked_mask.bit_count()
+        held += (window_held & full_mask).bit_count()
+
+        while free_mask:
+            lowest = free_mask & -free_mask
+            index = lowest.bit_length() - 1
+            slots.append(_label(start_minutes + index * slot_duration))
+            free_mask ^= lowest
+
+    return {
+        "slots": slots,
+        "total_slots": total,
+        "available_slots": available,
+        "booked_slots": booked,
+        "held_slots": held,
+    }
@@ -1,3 +1,37 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from clinic.models import Clinic
+from doctors.models import DoctorClinic, DoctorProfile
+from users.models import User
+
+
+class DoctorAvailabilityTemplateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(email="doctor@example.com", password="secret", role="doctor")
+        doctor = DoctorProfile.objects.create(user=user, specialization="Cardiology")
+        clinic = Clinic.objects.create(name="Heart Centre", address="", phone="", email="heart@example.com")
+        self.doctor_clinic = DoctorClinic.objects.create(doctor=doctor, clinic=clinic)
+        self.client.force_authenticate(user)
+
+    def post(self, weekdays):
+        return self.client.post("/api/doctors/availability-templates/", {
+            "doctor_clinic_id": self.doctor_clinic.id,
+            "weekdays": weekdays,
+            "start_time": "09:00",
+            "end_time": "12:00",
+            "start_date": "2099-01-01",
+            "end_date": "2099-01-31",
+        }, format="json")
+
+    def test_weekdays_must_be_a_list_of_integers(self):
+        for weekdays in ["135", [1, "3"], [True], {"day": 1}]:
+            with self.subTest(weekdays=weekdays):
+                response = self.post(weekdays)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data["error"], "weekdays must be a list of integers")
+
+    def test_weekdays_out_of_range_are_rejected(self):
+        response = self.post([1, 7])
+        self.assertEqual(response.status_code, 400)
@@ -6,6 +6,7 @@ from .views import (
     DoctorClinicAddView,
     DoctorClinicRemoveView,
     DoctorAvailabilityCreateView,
+    DoctorAvailabilityTemplateView,
     DoctorMyAppointmentsView,
     DoctorPastAppointmentsView,
 )
@@ -21,6 +22,7 @@ urlpatterns = [
     
     # Availability management
     path('add-availability/', DoctorAvailabilityCreateView.as_view(), name='doctor-add-availability'),
+    path('availability-templates/', DoctorAvailabilityTemplateView.as_view(), name='doctor-availability-templates'),
     
     # Appointments
     path('my-appointments/', DoctorMyAppointmentsView.as_view(), name='doctor-my-appointments'),
@@ -1,16 +1,33 @@
 # doctors/views.py - POSTGRESQL COMPATIBLE VERSION
-from django.db import connection
+from django.db import connection, transaction
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.views import APIView
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from doctors.serializers import (
     DoctorClinicSerializer, 
     DoctorAvailabilitySerializer,
+    DoctorAvailabilityTemplateSerializer,
     DoctorAppointmentSerializer,
     DoctorPastAppointmentSerializer,
     DoctorProfileSerializer
 )
+from appointments.slot_cache import invalidate_slots, invalidate_slot_days
+from doctors.next_slot import refresh_next_free_slots
+from doctors.directory import refresh_doctors
+from backend.conditional import bump_version, conditional_response
+from backend.pagination import (
+    InvalidPageRequest,
+    decode_cursor,
+    fetch_limit,
+    get_page_size,
+    paginate,
+    paginated_response,
+)
+
+
+# Longest span a recurring availability template may be expanded over
+MAX_TEMPLATE_RANGE_DAYS = 180
 
 
 def dictfetchall(cursor):
@@ -81,7 +98,8 @@ class DoctorProfileView(APIView):
                 SELECT id FROM doctors_doctorprofile WHERE user_id = %s
             """, [user.id])
             
-            if not cursor.fetchone():
+            doctor_row = cursor.fetchone()
+            if not doctor_row:
                 return Response({"error": "Doctor profile not found."}, status=404)
             
             # Check email uniqueness if email is being changed
@@ -145,14 +163,22 @@ class DoctorProfileView(APIView):
                     WHERE user_id = %s
                 """, profile_params)
         
+        if user_updates or profile_updates:
+            refresh_doctors([doctor_row[0]])
+        
         return Response({"message": "Profile updated successfully."})
 
 
 class DoctorClinicListView(APIView):
-    """Get list of clinics where the doctor is registered"""
+    """Get list of clinics where the doctor is registered (supports conditional GET)"""
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
+        return conditional_response(
+            request, ("doctor-clinics", request.user.id), lambda version: self.build_response(request)
+        )
+
+    def build_response(self, request):
         user = request.user
         
         with connection.cursor() as cursor:
@@ -232,6 +258,8 @@ class DoctorClinicAddView(APIView):
             
             new_id = cursor.fetchone()[0]
         
+        refresh_doctors([doctor_id])
+        bump_version("doctor-clinics", user.id)
         return Response({"message": "Clinic added successfully.", "id": new_id}, status=201)
 
 
@@ -282,6 +310,8 @@ class DoctorClinicRemoveView(APIView):
                 WHERE doctor_id = %s AND clinic_id = %s
             """, [doctor_id, clinic_id])
         
+        refresh_doctors([doctor_id])
+        bump_version("doctor-clinics", user.id)
         return Response({"message": "Clinic association removed successfully."})
 
 
@@ -337,15 +367,18 @@ class DoctorAvailabilityCreateView(APIView):
             if not cursor.fetchone():
                 return Response({"error": "You can only set availability for your own clinics."}, status=403)
             
-            # POSTGRESQL FIX: Use scheduled_time::date and scheduled_time::time
+            # Half-open range on the raw column so the doctor/time index can be used
             cursor.execute("""
                 SELECT COUNT(*) FROM appointments_appointment
                 WHERE doctor_id = %s 
-                  AND scheduled_time::date = %s
-                  AND scheduled_time::time >= %s
-                  AND scheduled_time::time < %s
+                  AND scheduled_time >= %s
+                  AND scheduled_time < %s
                   AND status != 'cancelled'
-            """, [doctor_id, availability_date, start_time, end_time])
+            """, [
+                doctor_id,
+                datetime.combine(availability_date, start_time),
+                datetime.combine(availability_date, end_time),
+            ])
             
             appt_count = cursor.fetchone()[0]
             if appt_count > 0:
@@ -382,16 +415,204 @@ class DoctorAvailabilityCreateView(APIView):
                 
                 availability_id = cursor.fetchone()[0]
                 message = "Availability created successfully."
+
+            invalidate_slots(doctor_clinic_id, availability_date)
+            refresh_next_free_slots([doctor_clinic_id])
         
         return Response({"message": message, "id": availability_id}, status=201)
 
 
+class DoctorAvailabilityTemplateView(APIView):
+    """
+    GET: List recurring weekly availability templates for the doctor's clinics
+    POST: Create templates for one clinic and expand them into availability rows
+
+    POST body:
+    - doctor_clinic_id
+    - weekdays: list of integer weekdays, 0 = Monday ... 6 = Sunday
+    - start_time, end_time (HH:MM), slot_duration (minutes, default 30)
+    - start_date, end_date (YYYY-MM-DD, inclusive, at most 180 days)
+
+    The whole range is checked for conflicting appointments with one query
+    and written with one INSERT ... ON CONFLICT upsert.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT 
+                    t.id,
+                    t.doctor_clinic_id,
+                    c.name as clinic_name,
+                    t.weekday,
+                    t.start_time,
+                    t.end_time,
+                    t.slot_duration,
+                    t.start_date,
+                    t.end_date,
+                    t.created_at
+                FROM doctors_doctoravailabilitytemplate t
+                INNER JOIN doctors_doctorclinic dc ON t.doctor_clinic_id = dc.id
+                INNER JOIN doctors_doctorprofile dp ON dc.doctor_id = dp.id
+                INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
+                WHERE dp.user_id = %s
+                ORDER BY c.name, t.weekday, t.start_time
+            """, [user.id])
+
+            templates = dictfetchall(cursor)
+
+        serializer = DoctorAvailabilityTemplateSerializer(templates, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        doctor_clinic_id = request.data.get("doctor_clinic_id")
+        weekdays = request.data.get("weekdays")
+        start_time_str = request.data.get("start_time")
+        end_time_str = request.data.get("end_time")
+        slot_duration = request.data.get("slot_duration", 30)
+        start_date_str = request.data.get("start_date")
+        end_date_str = request.data.get("end_date")
+
+        if not all([doctor_clinic_id, weekdays, start_time_str, end_time_str, start_date_str, end_date_str]):
+            return Response({"error": "Missing required fields"}, status=400)
+
+        # A string such as "135" is iterable too; only a JSON list of integers is accepted
+        if not isinstance(weekdays, list) or not all(
+            isinstance(day, int) and not isinstance(day, bool) for day in weekdays
+        ):
+            return Response({"error": "weekdays must be a list of integers"}, status=400)
+        weekdays = sorted(set(weekdays))
+
+        try:
+            slot_duration = int(slot_duration)
+            start_time = datetime.strptime(start_time_str, "%H:%M").time()
+            end_time = datetime.strptime(end_time_str, "%H:%M").time()
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid weekday, date or time format"}, status=400)
+
+        if any(day < 0 or day > 6 for day in weekdays):
+            return Response({"error": "Weekdays must be between 0 (Monday) and 6 (Sunday)"}, status=400)
+
+        if slot_duration <= 0:
+            return Response({"error": "Slot duration must be positive"}, status=400)
+
+        if start_time >= end_time:
+            return Response({"error": "Start time must be before end time"}, status=400)
+
+        if end_date < start_date:
+            return Response({"error": "End date must not be before start date"}, status=400)
+
+        if start_date < date.today():
+            return Response({"error": "Cannot set availability for past dates"}, status=400)
+
+        if (end_date - start_date).days + 1 > MAX_TEMPLATE_RANGE_DAYS:
+            return Response({
+                "error": f"Template range cannot exceed {MAX_TEMPLATE_RANGE_DAYS} days"
+            }, status=400)
+
+        # Expand the weekly pattern into concrete days, skipping today if it has already started
+        now = datetime.now()
+        dates = []
+        day = start_date
+        while day <= end_date:
+            if day.weekday() in weekdays and datetime.combine(day, start_time) > now:
+                dates.append(day)
+            day += timedelta(days=1)
+
+        if not dates:
+            return Response({"error": "No upcoming dates match the given weekdays"}, status=400)
+
+        user = request.user
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT dc.doctor_id
+                FROM doctors_doctorclinic dc
+                INNER JOIN doctors_doctorprofile dp ON dc.doctor_id = dp.id
+                WHERE dc.id = %s AND dp.user_id = %s
+            """, [doctor_clinic_id, user.id])
+
+            dc_row = cursor.fetchone()
+            if not dc_row:
+                return Response({"error": "You can only set availability for your own clinics."}, status=403)
+
+            doctor_id = dc_row[0]
+
+            # One set-based conflict check over every expanded window
+            cursor.execute("""
+                SELECT DISTINCT w.starts_at::date AS date
+                FROM unnest(%s::timestamp[], %s::timestamp[]) AS w(starts_at, ends_at)
+                WHERE EXISTS (
+                    SELECT 1 FROM appointments_appointment a
+                    WHERE a.doctor_id = %s
+                      AND a.scheduled_time >= w.starts_at
+                      AND a.scheduled_time < w.ends_at
+                      AND a.status != 'cancelled'
+                )
+                ORDER BY date
+            """, [
+                [datetime.combine(day, start_time) for day in dates],
+                [datetime.combine(day, end_time) for day in dates],
+                doctor_id,
+            ])
+
+            conflicts = [row[0].strftime("%Y-%m-%d") for row in cursor.fetchall()]
+            if conflicts:
+                return Response({
+                    "error": "Cannot update availability. Appointments exist in these time slots.",
+                    "conflicting_dates": conflicts
+                }, status=400)
+
+            cursor.execute("""
+                INSERT INTO doctors_doctoravailabilitytemplate 
+                (doctor_clinic_id, weekday, start_time, end_time, slot_duration, start_date, end_date, created_at)
+                SELECT %s::bigint, weekday, %s, %s, %s, %s, %s, NOW()
+                FROM unnest(%s::int[]) AS weekday
+                RETURNING id
+            """, [doctor_clinic_id, start_time, end_time, slot_duration, start_date, end_date, weekdays])
+
+            template_ids = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute("""
+                INSERT INTO doctors_doctoravailability 
+                (doctor_clinic_id, date, start_time, end_time, slot_duration, is_available, created_at)
+                SELECT %s::bigint, day, %s, %s, %s, TRUE, NOW()
+                FROM unnest(%s::date[]) AS day
+                ON CONFLICT (doctor_clinic_id, date, start_time) DO UPDATE
+                SET end_time = EXCLUDED.end_time,
+                    slot_duration = EXCLUDED.slot_duration,
+                    is_available = TRUE
+            """, [doctor_clinic_id, start_time, end_time, slot_duration, dates])
+
+            days_written = cursor.rowcount
+
+            invalidate_slot_days(doctor_clinic_id, dates)
+            refresh_next_free_slots([doctor_clinic_id])
+
+        return Response({
+            "message": "Availability template created successfully.",
+            "template_ids": template_ids,
+            "days_written": days_written
+        }, status=201)
+
+
 class DoctorMyAppointmentsView(APIView):
     """View all upcoming appointments for the doctor"""
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         user = request.user
+
+        try:
+            page_size = get_page_size(request)
+            after = decode_cursor(request, (datetime, int))
+        except InvalidPageRequest as e:
+            return Response({"error": str(e)}, status=400)
         
         with connection.cursor() as cursor:
             cursor.execute("""
@@ -404,6 +625,14 @@ class DoctorMyAppointmentsView(APIView):
             
             doctor_id = doctor_row[0]
             
+            # Keyset pagination: resume after the (scheduled_time, id) of the last row served
+            params = [doctor_id]
+            keyset_sql = ""
+            if after:
+                keyset_sql = "AND (a.scheduled_time, a.id) > (%s, %s)"
+                params.extend(after)
+            params.append(fetch_limit(page_size))
+
             cursor.execute("""
                 SELECT 
                     a.id,
@@ -422,13 +651,18 @@ class DoctorMyAppointmentsView(APIView):
                 WHERE a.doctor_id = %s
                   AND a.scheduled_time >= NOW()
                   AND a.status != 'cancelled'
-                ORDER BY a.scheduled_time ASC
-            """, [doctor_id])
-            
-            appointments = dictfetchall(cursor)
+                """ + keyset_sql + """
+                ORDER BY a.scheduled_time ASC, a.id ASC
+                LIMIT %s
+            """, params)
+            
+            appointments, next_cursor = paginate(
+                dictfetchall(cursor), page_size,
+                lambda row: (row['scheduled_time'], row['id'])
+            )
         
         serializer = DoctorAppointmentSerializer(appointments, many=True)
-        return Response(serializer.data)
+        return paginated_response(serializer.data, next_cursor)
 
 
 class DoctorPastAppointmentsView(APIView):
@@ -437,6 +671,12 @@ class DoctorPastAppointmentsView(APIView):
 
     def get(self, request):
         user = request.user
+
+        try:
+            page_size = get_page_size(request)
+            after = decode_cursor(request, (datetime, int))
+        except InvalidPageRequest as e:
+            return Response({"error": str(e)}, status=400)
         
         with connection.cursor() as cursor:
             cursor.execute("""
@@ -449,6 +689,15 @@ class DoctorPastAppointmentsView(APIView):
             
             doctor_id = doctor_row[0]
             
+            # Keyset pagination: resume after the (scheduled_time, id) of the last row served
+            params = [doctor_id]
+            keyset_sql = ""
+            if after:
+                # The plain range predicate lets Postgres prune newer monthly partitions
+                keyset_sql = "AND pa.scheduled_time <= %s AND (pa.scheduled_time, pa.id) < (%s, %s)"
+                params.extend([after[0]] + after)
+            params.append(fetch_limit(page_size))
+
             cursor.execute("""
                 SELECT 
                     pa.id,
@@ -466,10 +715,15 @@ class DoctorPastAppointmentsView(APIView):
                 INNER JOIN users_user u ON p.user_id = u.id
                 INNER JOIN clinic_clinic c ON pa.clinic_id = c.id
                 WHERE pa.doctor_id = %s
-                ORDER BY pa.scheduled_time DESC
-            """, [doctor_id])
-            
-            past_appointments = dictfetchall(cursor)
+                """ + keyset_sql + """
+                ORDER BY pa.scheduled_time DESC, pa.id DESC
+                LIMIT %s
+            """, params)
+            
+            past_appointments, next_cursor = paginate(
+                dictfetchall(cursor), page_size,
+                lambda row: (row['scheduled_time'], row['id'])
+            )
         
         serializer = DoctorPastAppointmentSerializer(past_appointments, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return paginated_response(serializer.data, next_cursor)
\ No newline at end of file
@@ -11,7 +11,7 @@ class NotificationAdmin(admin.ModelAdmin):
 
 @admin.register(EmailLog)
 class EmailLogAdmin(admin.ModelAdmin):
-    list_display = ['id', 'recipient_email', 'subject', 'notification_type', 'status', 'sent_at']
+    list_display = ['id', 'recipient_email', 'subject', 'notification_type', 'status', 'attempts', 'next_attempt_at', 'sent_at']
     list_filter = ['status', 'notification_type', 'created_at']
     search_fields = ['recipient_email', 'subject']
     readonly_fields = ['created_at', 'sent_at']
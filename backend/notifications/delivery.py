@@ -0,0 +1,105 @@
+# backend/notifications/delivery.py
+"""
+Pooled email delivery
+Opening an SMTP connection costs a TCP handshake, STARTTLS and AUTH, which
+dwarfs sending one short message. SMTPPool keeps one long-lived connection
+per worker thread and pushes every message of a chunk through it with
+send_messages, reconnecting only when the server drops the connection.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from smtplib import SMTPServerDisconnected
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPPool:
+    """A thread pool whose workers each hold an open email backend connection"""
+
+    def __init__(self, size, backend=None, **backend_options):
+        self.size = size
+        self.backend = backend
+        self.backend_options = backend_options
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = get_connection(self.backend, fail_silently=False, **self.backend_options)
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+                self.opened += 1
+        return connection
+
+    def discard_connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            return
+        self.local.connection = None
+        with self.lock:
+            self.connections.remove(connection)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def send_chunk(self, emails):
+        """Send emails over this thread's connection; returns [(email, error or None)]"""
+        results = []
+        for email in emails:
+            message = EmailMessage(
+                subject=email['subject'],
+                body=email['body'],
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email['recipient_email']],
+            )
+            # One message per call so a refused recipient fails only its own
+            # email; the connection stays open between calls
+            for retry in (True, False):
+                try:
+                    self.connection().send_messages([message])
+                    results.append((email, None))
+                    break
+                except SMTPServerDisconnected as e:
+                    self.discard_connection()
+                    if not retry:
+                        results.append((email, str(e) or e.__class__.__name__))
+                except Exception as e:
+                    # The session may be mid-transaction; start the next message afresh
+                    self.discard_connection()
+                    results.append((email, str(e) or e.__class__.__name__))
+                    break
+        return results
+
+    def deliver(self, emails):
+        """Spread emails over the pool; returns [(email, error or None)] in input order"""
+        if not emails:
+            return []
+        chunk_size = -(-len(emails) // self.size)
+        chunks = [emails[i:i + chunk_size] for i in range(0, len(emails), chunk_size)]
+        return [result for chunk in self.executor.map(self.send_chunk, chunks) for result in chunk]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Failed to close email connection", exc_info=True)
@@ -0,0 +1,105 @@
+# backend/notifications/fanout.py
+"""
+Notification fan-out
+notify() no longer INSERTs one Notification per call. Calls made inside
+a notification_fanout() block are collected and written with bulk_create
+(one INSERT per FANOUT_BATCH_SIZE rows) once the transaction commits.
+Emails queued with enqueue_email() join the same fan-out. Outside a
+block, notify() and enqueue_email() open a fan-out of their own, so
+callers that do not batch keep working.
+
+    with transaction.atomic(), notification_fanout():
+        for appointment in appointments:
+            appointment.status = 'cancelled'
+            appointment.save(update_fields=['status'])
+"""
+from contextlib import contextmanager
+from django.db import transaction
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+FANOUT_BATCH_SIZE = 500
+
+_local = threading.local()
+
+
+class NotificationFanout:
+    """Notification and EmailLog rows waiting for the transaction to commit"""
+
+    def __init__(self):
+        self.notifications = []
+        self.emails = []
+
+    def add_notification(self, recipient_id, title, message, notification_type, meta=None):
+        from notifications.models import Notification
+        self.notifications.append(Notification(
+            recipient_id=recipient_id,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            meta=meta or {},
+            is_read=False,
+        ))
+
+    def add_email(self, recipient_email, subject, body, notification_type=""):
+        from notifications.models import EmailLog
+        self.emails.append(EmailLog(
+            recipient_email=recipient_email,
+            subject=subject,
+            body=body,
+            notification_type=notification_type,
+            status='pending',
+        ))
+
+    def flush(self):
+        from notifications.models import EmailLog, Notification
+
+        if self.notifications:
+            Notification.objects.bulk_create(self.notifications, batch_size=FANOUT_BATCH_SIZE)
+        if self.emails:
+            EmailLog.objects.bulk_create(self.emails, batch_size=FANOUT_BATCH_SIZE)
+        logger.info(f"Fan-out wrote {len(self.notifications)} notification(s) and queued {len(self.emails)} email(s)")
+        self.notifications, self.emails = [], []
+
+
+def current_fanout():
+    """The active fan-out of this thread, or None"""
+    return getattr(_local, "fanout", None)
+
+
+@contextmanager
+def notification_fanout():
+    """
+    Collect notify()/enqueue_email() calls made in the block and write them
+    in bulk after commit. Nested blocks join the outermost one, and nothing
+    is written if the block raises or its transaction rolls back.
+    """
+    outer = current_fanout()
+    if outer is not None:
+        yield outer
+        return
+
+    fanout = NotificationFanout()
+    _local.fanout = fanout
+    try:
+        yield fanout
+    finally:
+        _local.fanout = None
+    # Not reached when the block raised
+    if fanout.notifications or fanout.emails:
+        transaction.on_commit(fanout.flush)
+
+
+def notify(recipient_id, title, message, notification_type, meta=None):
+    """Queue an in-app notification for the current fan-out"""
+    with notification_fanout() as fanout:
+        fanout.add_notification(recipient_id, title, message, notification_type, meta)
+
+
+def notify_many(notifications):
+    """Queue several notifications at once; each item holds notify()'s keyword arguments"""
+    with notification_fanout() as fanout:
+        for notification in notifications:
+            fanout.add_notification(**notification)
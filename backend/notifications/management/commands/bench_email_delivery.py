@@ -0,0 +1,108 @@
+# backend/notifications/management/commands/bench_email_delivery.py
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.delivery import SMTPPool
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark email throughput against a local SMTP server: one connection per "
+        "message (the old send_mail path) versus SMTPPool. Start a server with "
+        "`python -m aiosmtpd -n -l localhost:1025`, or pass --serve. Touches no database rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--port", type=int, default=1025)
+        parser.add_argument(
+            "--serve",
+            action="store_true",
+            help="Run an in-process aiosmtpd sink on --host/--port for the benchmark",
+        )
+
+    def backend_options(self, options):
+        return {
+            "host": options["host"],
+            "port": options["port"],
+            "username": "",
+            "password": "",
+            "use_tls": False,
+            "use_ssl": False,
+        }
+
+    def per_message(self, emails, options):
+        for email in emails:
+            connection = get_connection(SMTP_BACKEND, fail_silently=False, **self.backend_options(options))
+            EmailMessage(
+                subject=email['subject'],
+                body=email['body'],
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email['recipient_email']],
+                connection=connection,
+            ).send()
+        return 0
+
+    def pooled(self, workers):
+        def run(emails, options):
+            with SMTPPool(workers, SMTP_BACKEND, **self.backend_options(options)) as pool:
+                return sum(1 for _, error in pool.deliver(emails) if error)
+        return run
+
+    def start_server(self, options):
+        try:
+            from aiosmtpd.controller import Controller
+            from aiosmtpd.handlers import Sink
+        except ImportError:
+            raise CommandError("--serve needs aiosmtpd (pip install aiosmtpd)")
+        controller = Controller(Sink(), hostname=options["host"], port=options["port"])
+        controller.start()
+        return controller
+
+    def handle(self, *args, **options):
+        emails = [
+            {
+                'id': n,
+                'recipient_email': f"bench{n}@example.com",
+                'subject': f"Medicare: benchmark message {n}",
+                'body': "Appointment reminder\n" * 20,
+                'attempts': 1,
+            }
+            for n in range(options["messages"])
+        ]
+        modes = {
+            "connection per message": self.per_message,
+            "pooled, 1 connection": self.pooled(1),
+            f"pooled, {options['workers']} connections": self.pooled(options["workers"]),
+        }
+
+        controller = self.start_server(options) if options["serve"] else None
+        try:
+            results = {}
+            for mode, run in modes.items():
+                started = time.perf_counter()
+                try:
+                    failed = run(emails, options)
+                except OSError as e:
+                    raise CommandError(f"Cannot reach SMTP server at {options['host']}:{options['port']}: {e}")
+                if failed:
+                    raise CommandError(f"{mode}: {failed} message(s) failed")
+                results[mode] = time.perf_counter() - started
+        finally:
+            if controller:
+                controller.stop()
+
+        self.stdout.write(f"{options['messages']} messages to {options['host']}:{options['port']}")
+        for mode, seconds in results.items():
+            self.stdout.write(f"{mode:>24}: {seconds:8.2f} s ({options['messages'] / seconds:,.0f} msgs/s)")
+        baseline = results["connection per message"]
+        self.stdout.write(self.style.SUCCESS(
+            f"speedup: {baseline / min(results.values()):.1f}x"
+        ))
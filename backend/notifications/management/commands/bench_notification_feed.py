@@ -0,0 +1,79 @@
+# backend/notifications/management/commands/bench_notification_feed.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+from notifications.serializers import FEED_FIELDS, NotificationSerializer, serialize_notification_feed
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark NotificationSerializer against the lean feed serializer on one user's "
+        "notifications (inserts them in a transaction that is rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def serializer(self, queryset):
+        return NotificationSerializer(list(queryset), many=True).data
+
+    def feed(self, queryset):
+        return serialize_notification_feed(queryset.values_list(*FEED_FIELDS))
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        modes = {"NotificationSerializer": self.serializer, "feed": self.feed}
+        results = {}
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=f"bench-feed-{time.time_ns()}@example.com", password=None, role="patient"
+            )
+            now = timezone.now()
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient=user,
+                    notification_type='appointment_booked',
+                    title=f"Appointment Confirmed #{n}",
+                    message="Your appointment with Dr. Jane Doe at City Clinic is confirmed.",
+                    meta={
+                        'type': 'Appointment Booked',
+                        'withName': 'Dr. Jane Doe',
+                        'clinic_name': 'City Clinic',
+                        'date': now.strftime("%Y-%m-%d"),
+                        'time': now.strftime("%H:%M"),
+                        'status': 'Booked',
+                        'created_at': now.isoformat(),
+                    },
+                    is_read=n % 3 == 0,
+                )
+                for n in range(rows)
+            ], batch_size=1000)
+            queryset = Notification.objects.filter(recipient=user).order_by('-created_at', '-id')
+
+            outputs = {}
+            for mode, run in modes.items():
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    outputs[mode] = run(queryset)
+                    timings.append(time.perf_counter() - started)
+                results[mode] = min(timings)
+
+            transaction.set_rollback(True)
+
+        if [dict(item) for item in outputs["NotificationSerializer"]] != outputs["feed"]:
+            raise CommandError("The feed serializer output differs from NotificationSerializer")
+
+        self.stdout.write(f"Fetch and serialize {rows} notifications, best of {repeat}")
+        for mode, seconds in results.items():
+            self.stdout.write(f"{mode:>22}: {seconds * 1000:8.2f} ms ({rows / seconds:,.0f} rows/s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"speedup: {results['NotificationSerializer'] / results['feed']:.1f}x"
+        ))
@@ -0,0 +1,68 @@
+# backend/notifications/management/commands/dispatch_emails.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.delivery import SMTPPool
+from notifications.outbox import claim_emails, outbox_setting, record_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver pending EmailLog rows over pooled SMTP connections, with retries and "
+        "exponential backoff (safe to run on several nodes; use --every for a polling loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=outbox_setting("BATCH_SIZE", 200))
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=outbox_setting("WORKERS", 4),
+            help="Worker threads, each holding one open SMTP connection",
+        )
+        parser.add_argument("--max-attempts", type=int, default=outbox_setting("MAX_ATTEMPTS", 5))
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=outbox_setting("LEASE_SECONDS", 300),
+            help="Seconds a claimed email stays invisible to other dispatchers",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            default=0,
+            help="Keep running and poll every N seconds when the outbox is empty",
+        )
+
+    def drain(self, pool, options):
+        """Send batches until nothing is due; returns (sent, failed)"""
+        backoff = (outbox_setting("RETRY_BASE_SECONDS", 30), outbox_setting("RETRY_MAX_SECONDS", 3600))
+        sent = failed = 0
+
+        while True:
+            emails = claim_emails(options["batch_size"], options["lease"], options["max_attempts"])
+            if not emails:
+                return sent, failed
+
+            # Only the SMTP calls run in the pool; results are written from this thread
+            batch_sent, batch_failed = record_results(pool.deliver(emails), options["max_attempts"], *backoff)
+            sent += batch_sent
+            failed += batch_failed
+
+    def handle(self, *args, **options):
+        # Connections stay open across polls, so --every does not reconnect each sweep
+        with SMTPPool(options["workers"]) as pool:
+            while True:
+                started = time.perf_counter()
+                sent, failed = self.drain(pool, options)
+                elapsed = time.perf_counter() - started
+                if sent or failed or not options["every"]:
+                    rate = sent / elapsed if elapsed else 0
+                    self.stdout.write(
+                        f"Sent {sent} email(s), {failed} failed attempt(s) in {elapsed:.2f}s "
+                        f"({rate:.1f} emails/s over {pool.opened} connection(s))"
+                    )
+                if not options["every"]:
+                    break
+                time.sleep(options["every"])
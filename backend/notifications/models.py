@@ -43,7 +43,11 @@ class Notification(models.Model):
 
 
 class EmailLog(models.Model):
-    """Log all email notifications sent"""
+    """
+    Log all email notifications sent
+    Doubles as the outbox: rows are written as pending after the triggering
+    transaction commits and delivered by the dispatch_emails command.
+    """
     STATUS_CHOICES = [
         ('sent', 'Sent'),
         ('failed', 'Failed'),
@@ -58,12 +62,21 @@ class EmailLog(models.Model):
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # When a pending email is next due; a claimed email is pushed one lease ahead
+    next_attempt_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient_email', '-created_at']),
             models.Index(fields=['status']),
+            # Dispatcher claim scan: due pending emails
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='pending'),
+                name='emaillog_pending_due_idx',
+            ),
         ]
     
     def __str__(self):
@@ -0,0 +1,105 @@
+# backend/notifications/outbox.py
+"""
+Transactional email outbox
+Request code only queues emails: pending EmailLog rows are bulk-inserted
+(see fanout.py) once the surrounding transaction commits, so nothing is
+sent for rolled-back work and no SMTP round trip happens inside a request. The dispatch_emails
+command claims due rows with FOR UPDATE SKIP LOCKED (so several
+dispatchers can run at once), sends them over pooled SMTP connections
+(see delivery.py) and records the outcome in bulk, retrying failures
+with exponential backoff.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+# A claimed email is invisible to other dispatchers until the lease runs
+# out; if its dispatcher dies, the email simply becomes due again. Emails
+# that already used every attempt (their dispatcher died on the last one)
+# are marked failed instead of being claimed forever.
+CLAIM_EMAILS_SQL = """
+    WITH exhausted AS (
+        UPDATE notifications_emaillog
+        SET status = 'failed',
+            error_message = COALESCE(NULLIF(error_message, ''), 'No delivery result after ' || attempts || ' attempt(s)')
+        WHERE status = 'pending'
+          AND next_attempt_at <= NOW()
+          AND attempts >= %s
+    )
+    UPDATE notifications_emaillog e
+    SET attempts = e.attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => %s)
+    WHERE e.id IN (
+        SELECT id FROM notifications_emaillog
+        WHERE status = 'pending'
+          AND next_attempt_at <= NOW()
+          AND attempts < %s
+        ORDER BY next_attempt_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING e.id, e.recipient_email, e.subject, e.body, e.attempts
+"""
+
+
+def outbox_setting(name, default):
+    return getattr(settings, "EMAIL_OUTBOX", {}).get(name, default)
+
+
+def enqueue_email(recipient_email, subject, body, notification_type=""):
+    """Queue an email for delivery once the current transaction commits"""
+    from notifications.fanout import notification_fanout
+
+    with notification_fanout() as fanout:
+        fanout.add_email(recipient_email, subject, body, notification_type)
+
+
+def claim_emails(batch_size, lease_seconds, max_attempts):
+    """Claim up to batch_size due emails; returns dicts with id, recipient_email, subject, body, attempts"""
+    with connection.cursor() as cursor:
+        cursor.execute(CLAIM_EMAILS_SQL, [max_attempts, lease_seconds, max_attempts, batch_size])
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def retry_delay(attempts, base_seconds, max_seconds):
+    """Exponential backoff with +/-10% jitter so failed batches do not retry in lockstep"""
+    delay = min(base_seconds * 2 ** (attempts - 1), max_seconds)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def record_results(results, max_attempts, base_seconds, max_seconds):
+    """
+    Write back a delivered batch of (email, error or None) pairs: one UPDATE
+    for every sent email and one bulk UPDATE for the failures
+    """
+    from notifications.models import EmailLog
+
+    now = timezone.now()
+    sent_ids = [email['id'] for email, error in results if error is None]
+    if sent_ids:
+        EmailLog.objects.filter(pk__in=sent_ids).update(status='sent', sent_at=now, error_message='')
+
+    failures = []
+    for email, error in results:
+        if error is None:
+            continue
+        if email['attempts'] >= max_attempts:
+            failures.append(EmailLog(pk=email['id'], status='failed', error_message=error, next_attempt_at=now))
+            logger.error(f"Email #{email['id']} to {email['recipient_email']} failed permanently: {error}")
+        else:
+            delay = retry_delay(email['attempts'], base_seconds, max_seconds)
+            failures.append(EmailLog(
+                pk=email['id'], status='pending', error_message=error,
+                next_attempt_at=now + timedelta(seconds=delay),
+            ))
+            logger.warning(f"Email #{email['id']} to {email['recipient_email']} failed, retrying in {delay:.0f}s: {error}")
+    if failures:
+        EmailLog.objects.bulk_update(failures, ['status', 'error_message', 'next_attempt_at'])
+
+    return len(sent_ids), len(failures)
@@ -1,5 +1,6 @@
 # backend/notifications/serializers.py
 from rest_framework import serializers
+from django.utils import timezone
 from .models import Notification, EmailLog
 
 
@@ -38,6 +39,49 @@ class NotificationSerializer(serializers.ModelSerializer):
         return data
 
 
+# Columns the lean feed reads with values_list(), in unpacking order
+FEED_FIELDS = ('id', 'notification_type', 'title', 'message', 'meta', 'is_read', 'created_at', 'read_at')
+
+
+def feed_datetime(value):
+    """Same output as DRF's DateTimeField: ISO 8601 in the current timezone, UTC as Z"""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def serialize_notification_feed(rows):
+    """
+    Lean equivalent of NotificationSerializer(many=True).data for FEED_FIELDS
+    tuples: one flat loop instead of per-field serializer calls per row
+    """
+    data = []
+    append = data.append
+    for id, notification_type, title, message, meta, is_read, created_at, read_at in rows:
+        item = {
+            'id': id,
+            'notification_type': notification_type,
+            'title': title,
+            'message': message,
+            'meta': meta,
+            'created_at': feed_datetime(created_at),
+            'read_at': feed_datetime(read_at),
+        }
+        if meta:
+            get = meta.get
+            item['withName'] = get('withName')
+            item['clinic_name'] = get('clinic_name')
+            item['date'] = get('date')
+            item['time'] = get('time')
+            item['status'] = get('status')
+        item['read'] = is_read
+        append(item)
+    return data
+
+
 class EmailLogSerializer(serializers.ModelSerializer):
     """Serializer for email logs (admin only)"""
     
@@ -1,3 +1,112 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from notifications.models import EmailLog
+from notifications.outbox import claim_emails, enqueue_email
+
+
+class RefusingBackend(BaseEmailBackend):
+    """SMTP stand-in that refuses every recipient"""
+
+    def send_messages(self, email_messages):
+        raise SMTPRecipientsRefused({message.to[0]: (550, b"No such user") for message in email_messages})
+
+
+def dispatch():
+    call_command("dispatch_emails", "--max-attempts", "3", stdout=StringIO())
+
+
+# TransactionTestCase: the outbox compares against the database's NOW(),
+# which a TestCase would freeze at the start of its wrapping transaction
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class EmailOutboxTests(TransactionTestCase):
+
+    def queue(self, recipient="patient@example.com"):
+        enqueue_email(recipient, "Medicare: Appointment Confirmed", "See you soon", "appointment_booked")
+        return EmailLog.objects.get(recipient_email=recipient)
+
+    def make_due(self, email):
+        EmailLog.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_enqueue_creates_pending_row_after_commit(self):
+        email = self.queue()
+        self.assertEqual(email.status, "pending")
+        self.assertEqual(email.attempts, 0)
+        self.assertEqual(email.notification_type, "appointment_booked")
+        self.assertEqual(mail.outbox, [])
+
+    def test_claim_leases_email(self):
+        email = self.queue()
+        self.make_due(email)
+
+        claimed = claim_emails(10, 300, 3)
+        self.assertEqual([row["id"] for row in claimed], [email.id])
+        self.assertEqual(claimed[0]["attempts"], 1)
+
+        # Leased: invisible to a second dispatcher
+        self.assertEqual(claim_emails(10, 300, 3), [])
+        email.refresh_from_db()
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=250))
+
+    def test_expired_lease_is_claimed_again(self):
+        email = self.queue()
+        self.make_due(email)
+        claim_emails(10, 300, 3)
+
+        self.make_due(email)
+        claimed = claim_emails(10, 300, 3)
+        self.assertEqual(claimed[0]["attempts"], 2)
+
+    def test_exhausted_lease_is_marked_failed(self):
+        email = self.queue()
+        EmailLog.objects.filter(pk=email.pk).update(attempts=3)
+        self.make_due(email)
+
+        self.assertEqual(claim_emails(10, 300, 3), [])
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertIn("3 attempt", email.error_message)
+
+    def test_dispatch_sends_and_records(self):
+        email = self.queue()
+        self.make_due(email)
+
+        dispatch()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["patient@example.com"])
+        email.refresh_from_db()
+        self.assertEqual(email.status, "sent")
+        self.assertIsNotNone(email.sent_at)
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.RefusingBackend")
+    def test_failed_send_is_retried_with_backoff(self):
+        email = self.queue()
+        self.make_due(email)
+
+        dispatch()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, "pending")
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("patient@example.com", email.error_message)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.RefusingBackend")
+    def test_last_failed_attempt_marks_email_failed(self):
+        email = self.queue()
+        EmailLog.objects.filter(pk=email.pk).update(attempts=2)
+        self.make_due(email)
+
+        dispatch()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertEqual(email.attempts, 3)
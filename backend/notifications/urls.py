@@ -2,6 +2,7 @@
 from django.urls import path
 from .views import (
     NotificationListView,
+    NotificationFeedView,
     NotificationMarkReadView,
     NotificationMarkAllReadView,
     NotificationDeleteView,
@@ -12,6 +13,9 @@ from .views import (
 urlpatterns = [
     # List all notifications
     path('', NotificationListView.as_view(), name='notification-list'),
+
+    # Same list through the lean serializer
+    path('feed/', NotificationFeedView.as_view(), name='notification-feed'),
     
     # Mark specific notification as read
     path('<int:pk>/read/', NotificationMarkReadView.as_view(), name='notification-mark-read'),
@@ -3,8 +3,53 @@ from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.utils import timezone
+from django.db.models import Q
+from datetime import datetime
+from backend.pagination import (
+    InvalidPageRequest,
+    decode_cursor,
+    fetch_limit,
+    get_page_size,
+    paginate,
+    paginated_response,
+)
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import FEED_FIELDS, NotificationSerializer, serialize_notification_feed
+
+
+def notification_page(request):
+    """
+    One keyset page (plus one row) of the current user's notifications,
+    or all of them when unpaginated, filtered by ?is_read= and ?type=;
+    returns (queryset, page_size)
+    Raises InvalidPageRequest on a bad page_size or cursor
+    """
+    page_size = get_page_size(request)
+    after = decode_cursor(request, (datetime, int))
+
+    # Get all notifications for current user
+    notifications = Notification.objects.filter(recipient=request.user)
+    
+    # Apply filters if provided
+    is_read = request.query_params.get('is_read')
+    if is_read is not None:
+        is_read_bool = is_read.lower() in ['true', '1', 'yes']
+        notifications = notifications.filter(is_read=is_read_bool)
+    
+    notification_type = request.query_params.get('type')
+    if notification_type:
+        notifications = notifications.filter(notification_type=notification_type)
+
+    # Keyset pagination on (created_at, id), served by the (recipient, -created_at) index
+    if after:
+        created_at, notification_id = after
+        notifications = notifications.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=notification_id)
+        )
+    notifications = notifications.order_by('-created_at', '-id')
+    if page_size is not None:
+        notifications = notifications[:fetch_limit(page_size)]
+    return notifications, page_size
 
 
 class NotificationListView(APIView):
@@ -12,25 +57,47 @@ class NotificationListView(APIView):
     GET: List all notifications for current user
     - Returns unread notifications first
     - Includes all notification metadata
+    - Newest first; one page at a time with ?page_size= / ?cursor= (from X-Next-Cursor),
+      otherwise every notification
     """
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        # Get all notifications for current user
-        notifications = Notification.objects.filter(recipient=request.user)
-        
-        # Apply filters if provided
-        is_read = request.query_params.get('is_read')
-        if is_read is not None:
-            is_read_bool = is_read.lower() in ['true', '1', 'yes']
-            notifications = notifications.filter(is_read=is_read_bool)
-        
-        notification_type = request.query_params.get('type')
-        if notification_type:
-            notifications = notifications.filter(notification_type=notification_type)
+        try:
+            notifications, page_size = notification_page(request)
+        except InvalidPageRequest as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        notifications, next_cursor = paginate(
+            list(notifications), page_size,
+            lambda notification: (notification.created_at, notification.id)
+        )
         
         serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data)
+        return paginated_response(serializer.data, next_cursor)
+
+
+class NotificationFeedView(APIView):
+    """
+    GET: Fast feed mode of NotificationListView, with the same filters,
+    pagination and response body. Reads only the serialized columns as
+    tuples and renders them with serialize_notification_feed() instead of
+    building model instances and running NotificationSerializer.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            notifications, page_size = notification_page(request)
+        except InvalidPageRequest as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        created_at, notification_id = FEED_FIELDS.index('created_at'), FEED_FIELDS.index('id')
+        rows, next_cursor = paginate(
+            list(notifications.values_list(*FEED_FIELDS)), page_size,
+            lambda row: (row[created_at], row[notification_id])
+        )
+        return paginated_response(serialize_notification_feed(rows), next_cursor)
 
 
 class NotificationMarkReadView(APIView):
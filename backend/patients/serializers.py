@@ -52,6 +52,17 @@ class DoctorDetailSerializer(serializers.Serializer):
     clinics = DoctorClinicInfoSerializer(many=True)
 
 
+class NextAvailableSlotSerializer(serializers.Serializer):
+    doctor_id = serializers.IntegerField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    specialization = serializers.CharField()
+    clinic_id = serializers.IntegerField()
+    clinic_name = serializers.CharField()
+    consultation_fee = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    scheduled_time = serializers.CharField()
+
+
 class AvailableSlotsSerializer(serializers.Serializer):
     date = serializers.DateField()
     slots = serializers.ListField(child=serializers.CharField())
@@ -1,3 +1,145 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from clinic.models import Clinic
+from doctors.directory import warm_directory
+from doctors.models import DoctorClinic, DoctorProfile
+from users.models import User
+
+
+def create_doctor(first_name, last_name, specialization):
+    user = User.objects.create_user(
+        email=f"{first_name}.{last_name}@example.com".lower(),
+        password="secret",
+        role="doctor",
+        first_name=first_name,
+        last_name=last_name,
+    )
+    return DoctorProfile.objects.create(user=user, specialization=specialization)
+
+
+class DoctorSearchPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        patient = User.objects.create_user(email="patient@example.com", password="secret", role="patient")
+        self.client.force_authenticate(patient)
+
+    def page_through(self, params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, cursor=cursor) if cursor else params
+            response = self.client.get("/api/patient/doctors/", query)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(doctor["id"] for doctor in response.data["results"])
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return ids
+
+    def test_fuzzy_search_pages_through_tied_scores(self):
+        # Same specialization: every doctor gets the same, non-integral score
+        doctors = [create_doctor(f"Sam{n}", "Carter", "Cardiology") for n in range(7)]
+
+        ids = self.page_through({"q": "cardiolgy", "page_size": 2})
+
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), sorted(doctor.id for doctor in doctors))
+
+    def test_name_filter_pages_in_database_order(self):
+        # Mixed case: the keyset must follow the database collation
+        names = ["adams", "Baker", "baker", "Carter", "carter", "Zed", "zed"]
+        doctors = [create_doctor(name, f"Lee{n}", "Dermatology") for n, name in enumerate(names)]
+
+        ids = self.page_through({"specialization": "derma", "page_size": 2})
+
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), sorted(doctor.id for doctor in doctors))
+
+    def test_unpaginated_list_returns_every_match_and_total(self):
+        for n in range(55):
+            create_doctor(f"Ann{n}", "Oakes", "Neurology")
+
+        response = self.client.get("/api/patient/doctors/", {"specialization": "neuro"})
+        self.assertEqual(len(response.data["results"]), 55)
+        self.assertEqual(response.data["count"], 55)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+        response = self.client.get("/api/patient/doctors/", {"specialization": "neuro", "page_size": 10})
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["count"], 55)
+        self.assertIn("X-Next-Cursor", response.headers)
+
+
+class DoctorSearchQueryCountTests(TestCase):
+    """Doctor search stays one round trip however many doctors and clinics match"""
+
+    def setUp(self):
+        self.client = APIClient()
+        patient = User.objects.create_user(email="patient@example.com", password="secret", role="patient")
+        self.client.force_authenticate(patient)
+        self.clinics = [
+            Clinic.objects.create(name=f"Heart Centre {n}", address="", phone="", email=f"c{n}@example.com")
+            for n in range(3)
+        ]
+
+    def add_doctors(self, count, offset=0):
+        for n in range(offset, offset + count):
+            doctor = create_doctor(f"Doc{n}", "Heartwell", "Cardiology")
+            for clinic in self.clinics:
+                DoctorClinic.objects.create(doctor=doctor, clinic=clinic)
+
+    def search(self):
+        response = self.client.get("/api/patient/doctors/", {"q": "cardiology", "page_size": 200})
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_fuzzy_search_is_one_query(self):
+        self.add_doctors(5)
+        with self.assertNumQueries(1):
+            results = self.search()
+        self.assertEqual(len(results), 5)
+
+        self.add_doctors(45, offset=5)
+        with self.assertNumQueries(1):
+            results = self.search()
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(len(doctor["clinics"]) == 3 for doctor in results))
+
+    def test_filtered_search_is_one_query(self):
+        self.add_doctors(20)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/patient/doctors/", {"clinic_name": "heart centre 1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 20)
+
+
+class DoctorDirectoryListTests(TestCase):
+    """The unfiltered doctor list is served from the in-process directory"""
+
+    def setUp(self):
+        self.client = APIClient()
+        patient = User.objects.create_user(email="patient@example.com", password="secret", role="patient")
+        self.client.force_authenticate(patient)
+        names = ["adams", "Baker", "baker", "Carter", "carter", "Zed", "zed"]
+        self.doctors = [create_doctor(name, f"Hale{n}", "Oncology") for n, name in enumerate(names)]
+        warm_directory()
+
+    def test_unfiltered_list_runs_no_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/patient/doctors/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], len(self.doctors))
+        self.assertEqual(len(response.data["results"]), len(self.doctors))
+
+    def test_unfiltered_list_pages_through_directory(self):
+        ids, cursor = [], None
+        while True:
+            params = {"page_size": 2, "cursor": cursor} if cursor else {"page_size": 2}
+            response = self.client.get("/api/patient/doctors/", params)
+            self.assertEqual(response.data["count"], len(self.doctors))
+            ids.extend(doctor["id"] for doctor in response.data["results"])
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        self.assertEqual(ids, [doctor["id"] for doctor in self.client.get("/api/patient/doctors/").data["results"]])
+        self.assertEqual(sorted(ids), sorted(doctor.id for doctor in self.doctors))
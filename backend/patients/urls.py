@@ -4,8 +4,14 @@ from .views import (
     PatientProfileView,
     PatientDoctorListView,
     PatientDoctorDetailView,
+    PatientDoctorDirectoryStatsView,
     PatientDoctorAvailabilityView,
+    PatientDoctorAvailabilityRangeView,
+    PatientSlotCacheStatsView,
+    PatientNextAvailableView,
     PatientBookAppointmentView,
+    PatientBatchBookAppointmentView,
+    PatientSlotHoldView,
     PatientMyAppointmentsView,
     PatientPastAppointmentsView,
     PatientCancelAppointmentView,
@@ -18,10 +24,17 @@ urlpatterns = [
     # Doctor browsing
     path('doctors/', PatientDoctorListView.as_view(), name='patient-doctor-list'),
     path('doctors/<int:pk>/', PatientDoctorDetailView.as_view(), name='patient-doctor-detail'),
+    path('doctors/directory-stats/', PatientDoctorDirectoryStatsView.as_view(), name='patient-doctor-directory-stats'),
     path('doctor-availability/', PatientDoctorAvailabilityView.as_view(), name='patient-doctor-availability'),
+    path('doctor-availability/range/', PatientDoctorAvailabilityRangeView.as_view(), name='patient-doctor-availability-range'),
+    path('doctor-availability/cache-stats/', PatientSlotCacheStatsView.as_view(), name='patient-slot-cache-stats'),
+    path('next-available/', PatientNextAvailableView.as_view(), name='patient-next-available'),
     
     # Appointment management
     path('book-appointment/', PatientBookAppointmentView.as_view(), name='patient-book-appointment'),
+    path('book-appointments/batch/', PatientBatchBookAppointmentView.as_view(), name='patient-book-appointments-batch'),
+    path('hold-slot/', PatientSlotHoldView.as_view(), name='patient-hold-slot'),
+    path('hold-slot/<int:hold_id>/', PatientSlotHoldView.as_view(), name='patient-release-hold'),
     path('my-appointments/', PatientMyAppointmentsView.as_view(), name='patient-my-appointments'),
     path('past-appointments/', PatientPastAppointmentsView.as_view(), name='patient-past-appointments'),
     path('cancel-appointment/<int:appointment_id>/', PatientCancelAppointmentView.as_view(), name='patient-cancel-appointment'),
@@ -1,16 +1,37 @@
 # patients/views.py - POSTGRESQL COMPATIBLE VERSION
-from django.db import connection
+from django.db import connection, transaction, IntegrityError
 from rest_framework.response import Response
 from rest_framework import permissions
 from rest_framework.views import APIView
 from datetime import datetime, timedelta, date
 from django.utils import timezone
+from django.conf import settings
 from patients.serializers import (
     DoctorListSerializer,
     DoctorDetailSerializer,
     AppointmentSerializer,
     PastAppointmentSerializer,
-    PatientProfileSerializer
+    PatientProfileSerializer,
+    NextAvailableSlotSerializer,
+)
+from appointments.slot_cache import (
+    get_cached_slots,
+    set_cached_slots,
+    invalidate_slots,
+    invalidate_slot_days,
+    slot_cache_stats,
+)
+from doctors.next_slot import refresh_next_free_slots
+from doctors.slot_bitmap import pack_window, summarize_windows
+from backend.conditional import bump_version, conditional_response
+from doctors.directory import DOCTOR_CLINICS_LATERAL_SQL, get_doctor, directory_stats, list_doctors
+from backend.pagination import (
+    InvalidPageRequest,
+    decode_cursor,
+    fetch_limit,
+    get_page_size,
+    paginate,
+    paginated_response,
 )
 import re
 
@@ -30,6 +51,127 @@ def dictfetchone(cursor):
     return dict(zip(columns, row))
 
 
+# Upper bound on how many days one availability range request may span
+MAX_AVAILABILITY_RANGE_DAYS = 60
+
+# Upper bound on how many appointments one batch booking may contain
+MAX_BATCH_BOOKING_SIZE = 50
+
+
+# Validates a requested slot for the current patient. Expects the named
+# parameters user_id, doctor_id, clinic_id, slot_date, slot_time and
+# scheduled_time; "held" lists live holds on the slot by other patients.
+SLOT_CHECK_CTES = """
+    patient AS (
+        SELECT id FROM patients_patientprofile WHERE user_id = %(user_id)s
+    ),
+    doctor_clinic AS (
+        SELECT id FROM doctors_doctorclinic
+        WHERE doctor_id = %(doctor_id)s AND clinic_id = %(clinic_id)s
+    ),
+    day_windows AS (
+        SELECT da.start_time, da.end_time, da.slot_duration
+        FROM doctors_doctoravailability da
+        INNER JOIN doctor_clinic dc ON da.doctor_clinic_id = dc.id
+        WHERE da.date = %(slot_date)s
+          AND da.is_available = TRUE
+    ),
+    slot_window AS (
+        SELECT start_time, slot_duration
+        FROM day_windows
+        WHERE start_time <= %(slot_time)s
+          AND end_time > %(slot_time)s
+    ),
+    aligned AS (
+        SELECT 1
+        FROM slot_window
+        WHERE MOD(EXTRACT(EPOCH FROM (%(slot_time)s - start_time))::int / 60, slot_duration) = 0
+        LIMIT 1
+    ),
+    held AS (
+        SELECT h.expires_at
+        FROM appointments_slothold h, patient
+        WHERE h.doctor_id = %(doctor_id)s
+          AND h.clinic_id = %(clinic_id)s
+          AND h.scheduled_time = %(scheduled_time)s
+          AND h.expires_at > NOW()
+          AND h.patient_id <> patient.id
+    )
+"""
+
+SLOT_CHECK_COLUMNS = """
+    (SELECT id FROM patient) AS patient_id,
+    (SELECT id FROM doctor_clinic) AS doctor_clinic_id,
+    EXISTS (SELECT 1 FROM day_windows) AS has_day,
+    EXISTS (SELECT 1 FROM slot_window) AS in_window,
+    EXISTS (SELECT 1 FROM aligned) AS is_aligned,
+    EXISTS (SELECT 1 FROM held) AS is_held
+"""
+
+
+# Per-specialization and per-clinic counts over a doctor search query
+# (any SELECT over doctors_doctorprofile exposing id and specialization).
+# by_clinic tells the two grouping sets apart.
+DOCTOR_FACETS_SQL = """
+    WITH matched AS ({search_sql})
+    SELECT
+        GROUPING(m.specialization) = 1 AS by_clinic,
+        m.specialization,
+        c.id AS clinic_id,
+        c.name AS clinic_name,
+        COUNT(DISTINCT m.id) AS count
+    FROM matched m
+    LEFT JOIN doctors_doctorclinic dc ON dc.doctor_id = m.id
+    LEFT JOIN clinic_clinic c ON dc.clinic_id = c.id
+    GROUP BY GROUPING SETS ((m.specialization), (c.id, c.name))
+    ORDER BY count DESC, m.specialization, c.name
+"""
+
+
+def fetch_held_minutes(cursor, doctor_id, clinic_id, first_day, last_day, user_id):
+    """Return {date: {minutes after midnight}} of live holds by other patients"""
+    day_start = datetime.combine(first_day, datetime.min.time())
+    cursor.execute("""
+        SELECT h.scheduled_time
+        FROM appointments_slothold h
+        INNER JOIN patients_patientprofile p ON h.patient_id = p.id
+        WHERE h.doctor_id = %s
+          AND h.clinic_id = %s
+          AND h.scheduled_time >= %s
+          AND h.scheduled_time < %s
+          AND h.expires_at > NOW()
+          AND p.user_id <> %s
+    """, [doctor_id, clinic_id, day_start, datetime.combine(last_day + timedelta(days=1), datetime.min.time()), user_id])
+
+    held = {}
+    for (scheduled_time,) in cursor.fetchall():
+        held.setdefault(scheduled_time.date(), set()).add(scheduled_time.hour * 60 + scheduled_time.minute)
+    return held
+
+
+def slot_check_error(result):
+    """Map the SLOT_CHECK_COLUMNS of a booking/hold statement to an error response, or None"""
+    if result['patient_id'] is None:
+        return Response({"error": "User is not a patient."}, status=400)
+
+    if result['doctor_clinic_id'] is None:
+        return Response({"error": "Doctor is not registered at this clinic."}, status=404)
+
+    if not result['has_day']:
+        return Response({"error": "Doctor is not available on this date."}, status=400)
+
+    if not result['in_window']:
+        return Response({"error": "Scheduled time is outside doctor's availability window."}, status=400)
+
+    if not result['is_aligned']:
+        return Response({"error": "Scheduled time does not align with slot duration."}, status=400)
+
+    if result['is_held']:
+        return Response({"error": "This slot is currently held by another patient."}, status=409)
+
+    return None
+
+
 def validate_phone(phone):
     """Validate phone number format"""
     if not phone:
@@ -44,7 +186,13 @@ class PatientProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        """Get patient profile"""
+        """Get patient profile (conditional GET; age changes daily, so the ETag varies by date)"""
+        return conditional_response(
+            request, ("patient-profile", request.user.id), lambda version: self.build_profile(request),
+            vary=[date.today()],
+        )
+
+    def build_profile(self, request):
         user = request.user
         
         with connection.cursor() as cursor:
@@ -173,108 +321,32 @@ class PatientProfileView(APIView):
                     WHERE user_id = %s
                 """, profile_params)
         
+        bump_version("patient-profile", user.id)
         return Response({"message": "Profile updated successfully."})
 
 
-class PatientDoctorListView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request):
-        clinic_id = request.query_params.get("clinic_id")
-        specialization = request.query_params.get("specialization")
-        name = request.query_params.get("name")
-
-        with connection.cursor() as cursor:
-            sql = """
-                SELECT DISTINCT
-                    dp.id,
-                    dp.user_id,
-                    u.first_name,
-                    u.last_name,
-                    dp.specialization,
-                    dp.qualification,
-                    dp.experience_years
-                FROM doctors_doctorprofile dp
-                INNER JOIN users_user u ON dp.user_id = u.id
-                WHERE 1=1
-            """
-            params = []
-
-            if clinic_id:
-                sql += " AND EXISTS (SELECT 1 FROM doctors_doctorclinic dc WHERE dc.doctor_id = dp.id AND dc.clinic_id = %s)"
-                params.append(clinic_id)
-
-            if specialization:
-                sql += " AND dp.specialization ILIKE %s"
-                params.append(f"%{specialization}%")
-
-            if name:
-                sql += " AND (u.first_name ILIKE %s OR u.last_name ILIKE %s)"
-                params.extend([f"%{name}%", f"%{name}%"])
-
-            sql += " ORDER BY u.first_name, u.last_name"
-
-            cursor.execute(sql, params)
-            doctors = dictfetchall(cursor)
-
-            for doctor in doctors:
-                cursor.execute("""
-                    SELECT 
-                        dc.clinic_id,
-                        c.name as clinic_name,
-                        dc.consultation_fee
-                    FROM doctors_doctorclinic dc
-                    INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
-                    WHERE dc.doctor_id = %s
-                """, [doctor['id']])
-                
-                doctor['clinics'] = dictfetchall(cursor)
-
-        serializer = DoctorListSerializer(doctors, many=True)
-        return Response(serializer.data)
-
-
 class PatientDoctorDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, pk):
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    dp.id,
-                    dp.user_id,
-                    u.first_name,
-                    u.last_name,
-                    dp.specialization,
-                    dp.qualification,
-                    dp.experience_years
-                FROM doctors_doctorprofile dp
-                INNER JOIN users_user u ON dp.user_id = u.id
-                WHERE dp.id = %s
-            """, [pk])
+        return conditional_response(request, ("doctor", pk), lambda version: self.build_response(pk, version))
 
-            doctor = dictfetchone(cursor)
-            if not doctor:
-                return Response({"detail": "Doctor not found."}, status=404)
-
-            cursor.execute("""
-                SELECT 
-                    dc.clinic_id,
-                    c.name as clinic_name,
-                    dc.consultation_fee
-                FROM doctors_doctorclinic dc
-                INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
-                WHERE dc.doctor_id = %s
-            """, [doctor['id']])
-            
-            doctor['clinics'] = dictfetchall(cursor)
+    def build_response(self, pk, version):
+        # Entries this worker read before the doctor's last change are reloaded
+        _, changed_at = version
+        doctor = get_doctor(pk, changed_at=changed_at)
+        if not doctor:
+            return Response({"detail": "Doctor not found."}, status=404)
 
         serializer = DoctorDetailSerializer(doctor)
         return Response(serializer.data)
 
 
 class PatientDoctorAvailabilityView(APIView):
-    """Get available time slots for a doctor at a clinic on a specific date"""
+    """
+    Get available time slots for a doctor at a clinic on a specific date
+    Supports conditional GET (ETag) keyed on the day's availability version.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -305,56 +377,239 @@ class PatientDoctorAvailabilityView(APIView):
 
             doctor_clinic_id = dc_row[0]
 
-            cursor.execute("""
-                SELECT 
-                    date, start_time, end_time, slot_duration
-                FROM doctors_doctoravailability
-                WHERE doctor_clinic_id = %s 
-                  AND date = %s 
-                  AND is_available = TRUE
-            """, [doctor_clinic_id, availability_date])
-
-            availability = dictfetchone(cursor)
-            if not availability:
+        # The body also depends on who asks (their own holds are not hidden)
+        # and, for today, on the clock (started slots drop out)
+        now = datetime.now()
+        vary = [request.user.id]
+        if availability_date == now.date():
+            vary.append(now.strftime("%H:%M"))
+
+        return conditional_response(
+            request,
+            ("availability", doctor_clinic_id, availability_date),
+            lambda version: self.build_response(
+                request, doctor_id, clinic_id, doctor_clinic_id, availability_date, date_str, version
+            ),
+            vary=vary,
+        )
+
+    def build_response(self, request, doctor_id, clinic_id, doctor_clinic_id, availability_date, date_str, version):
+        # Cached under the version read before the query: a change committed
+        # meanwhile moves readers to a new key, so stale windows are never served
+        token, _ = version
+        with connection.cursor() as cursor:
+            windows = get_cached_slots(doctor_clinic_id, availability_date, token)
+            if windows is None:
+                cursor.execute("""
+                    SELECT 
+                        start_time, end_time, slot_duration, booked_mask
+                    FROM doctors_doctoravailability
+                    WHERE doctor_clinic_id = %s 
+                      AND date = %s 
+                      AND is_available = TRUE
+                    ORDER BY start_time
+                """, [doctor_clinic_id, availability_date])
+
+                windows = [pack_window(row) for row in dictfetchall(cursor)]
+                set_cached_slots(doctor_clinic_id, availability_date, token, windows)
+
+            if not windows:
                 return Response({"date": date_str, "slots": [], "message": "No availability set for this date"})
 
-            start_dt = datetime.combine(availability['date'], availability['start_time'])
-            end_dt = datetime.combine(availability['date'], availability['end_time'])
-            delta = timedelta(minutes=availability['slot_duration'])
+            # Holds are short-lived, so they are read live rather than cached
+            held = fetch_held_minutes(
+                cursor, doctor_id, clinic_id, availability_date, availability_date, request.user.id
+            )
 
-            all_slots = []
-            current = start_dt
-            
-            now = datetime.now()
-            while current < end_dt:
-                if availability_date == date.today():
-                    if current > now:
-                        all_slots.append(current.strftime("%H:%M"))
-                else:
-                    all_slots.append(current.strftime("%H:%M"))
-                current += delta
-
-            # POSTGRESQL FIX: Use scheduled_time::time instead of TIME(scheduled_time)
-            cursor.execute("""
-                SELECT scheduled_time::time as start_time
-                FROM appointments_appointment
-                WHERE doctor_id = %s 
-                  AND clinic_id = %s 
-                  AND scheduled_time::date = %s
-                  AND status IN ('booked', 'rescheduled')
-            """, [doctor_id, clinic_id, availability_date])
+        summary = summarize_windows(
+            windows, availability_date, now=datetime.now(), held_minutes=held.get(availability_date, ())
+        )
+
+        return Response({"date": date_str, **summary})
+
+
+class PatientSlotCacheStatsView(APIView):
+    """Hit/miss counters of this worker's slot availability cache lookups (admin only)"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(slot_cache_stats())
+
+
+class PatientDoctorDirectoryStatsView(APIView):
+    """Size and staleness of this worker's in-process doctor directory (admin only)"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(directory_stats())
+
+
+class PatientDoctorAvailabilityRangeView(APIView):
+    """
+    Get available time slots for a doctor at a clinic across a date range
+
+    Query Parameters:
+    - doctor_id, clinic_id: The doctor-clinic pair to look up
+    - start_date, end_date: Inclusive range in YYYY-MM-DD (at most 60 days)
+
+    Availability windows for the whole range, with their booked slot
+    bitmaps, are fetched in one query and summarized per day.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        doctor_id = request.query_params.get("doctor_id")
+        clinic_id = request.query_params.get("clinic_id")
+        start_date_str = request.query_params.get("start_date")
+        end_date_str = request.query_params.get("end_date")
+
+        if not all([doctor_id, clinic_id, start_date_str, end_date_str]):
+            return Response({"error": "doctor_id, clinic_id, start_date and end_date are required."}, status=400)
+
+        try:
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=400)
+
+        if end_date < start_date:
+            return Response({"error": "end_date must not be before start_date."}, status=400)
+
+        if (end_date - start_date).days + 1 > MAX_AVAILABILITY_RANGE_DAYS:
+            return Response({
+                "error": f"Date range cannot exceed {MAX_AVAILABILITY_RANGE_DAYS} days."
+            }, status=400)
 
-            booked_rows = cursor.fetchall()
-            booked_set = {row[0].strftime("%H:%M") for row in booked_rows}
+        # Past days can never be booked, so only look from today onwards
+        first_day = max(start_date, date.today())
+        days = {}
+        day = first_day
+        while day <= end_date:
+            days[day] = []
+            day += timedelta(days=1)
 
-            free_slots = [slot for slot in all_slots if slot not in booked_set]
+        if days:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id FROM doctors_doctorclinic
+                    WHERE doctor_id = %s AND clinic_id = %s
+                """, [doctor_id, clinic_id])
+
+                dc_row = cursor.fetchone()
+                if not dc_row:
+                    return Response({"error": "Invalid doctor-clinic relationship."}, status=404)
+
+                doctor_clinic_id = dc_row[0]
+
+                cursor.execute("""
+                    SELECT 
+                        date, start_time, end_time, slot_duration, booked_mask
+                    FROM doctors_doctoravailability
+                    WHERE doctor_clinic_id = %s 
+                      AND date >= %s 
+                      AND date <= %s
+                      AND is_available = TRUE
+                    ORDER BY date, start_time
+                """, [doctor_clinic_id, first_day, end_date])
+
+                rows = dictfetchall(cursor)
+                for row in rows:
+                    days[row['date']].append(pack_window(row))
+
+                held = {}
+                if rows:
+                    held = fetch_held_minutes(cursor, doctor_id, clinic_id, first_day, end_date, request.user.id)
+
+        now = datetime.now()
+        results = [
+            {
+                "date": day.strftime("%Y-%m-%d"),
+                **summarize_windows(windows, day, now=now, held_minutes=held.get(day, ())),
+            }
+            for day, windows in days.items()
+        ]
 
         return Response({
-            "date": date_str, 
-            "slots": free_slots,
-            "total_slots": len(all_slots),
-            "available_slots": len(free_slots),
-            "booked_slots": len(booked_set)
+            "doctor_id": doctor_id,
+            "clinic_id": clinic_id,
+            "start_date": start_date_str,
+            "end_date": end_date_str,
+            "days": results,
+        })
+
+
+class PatientNextAvailableView(APIView):
+    """
+    Earliest free slots across all doctors matching the filters
+
+    Query Parameters:
+    - specialization: Filter by specialization (partial match, case-insensitive)
+    - clinic_name: Filter by clinic name (partial match, case-insensitive)
+    - limit: Number of results (default 10, max 50)
+
+    Served from doctors_doctorclinic.next_free_slot, one entry per doctor-clinic.
+    Read-only: the value is maintained by the booking, cancel and hold paths
+    and the refresh_next_slots command, and entries whose slot was held
+    since are left out.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        specialization = request.query_params.get("specialization")
+        clinic_name = request.query_params.get("clinic_name")
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=400)
+
+        with connection.cursor() as cursor:
+            sql = """
+                SELECT 
+                    dp.id as doctor_id,
+                    u.first_name,
+                    u.last_name,
+                    dp.specialization,
+                    dc.clinic_id,
+                    c.name as clinic_name,
+                    dc.consultation_fee,
+                    dc.next_free_slot
+                FROM doctors_doctorclinic dc
+                INNER JOIN doctors_doctorprofile dp ON dc.doctor_id = dp.id
+                INNER JOIN users_user u ON dp.user_id = u.id
+                INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
+                WHERE dc.next_free_slot > NOW()
+                  AND NOT EXISTS (
+                      SELECT 1 FROM appointments_slothold h
+                      WHERE h.doctor_id = dc.doctor_id
+                        AND h.clinic_id = dc.clinic_id
+                        AND h.scheduled_time = dc.next_free_slot
+                        AND h.expires_at > NOW()
+                  )
+            """
+            params = []
+
+            if specialization:
+                sql += " AND dp.specialization ILIKE %s"
+                params.append(f"%{specialization}%")
+
+            if clinic_name:
+                sql += " AND c.name ILIKE %s"
+                params.append(f"%{clinic_name}%")
+
+            sql += " ORDER BY dc.next_free_slot, dc.id LIMIT %s"
+            params.append(limit)
+
+            cursor.execute(sql, params)
+            results = dictfetchall(cursor)
+
+        for row in results:
+            row['scheduled_time'] = row.pop('next_free_slot').strftime("%Y-%m-%dT%H:%M")
+
+        serializer = NextAvailableSlotSerializer(results, many=True)
+        return Response({
+            "count": len(results),
+            "results": serializer.data
         })
 
 
@@ -380,83 +635,435 @@ class PatientBookAppointmentView(APIView):
 
         user = request.user
 
+        # Validation and insert run as a single statement. The partial unique
+        # index on active (doctor, clinic, scheduled_time) rows makes a
+        # concurrent booking of the same slot fall through ON CONFLICT, so a
+        # lost race is reported as 409 without another round trip.
         with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT id FROM patients_patientprofile WHERE user_id = %s
-            """, [user.id])
+            cursor.execute("WITH " + SLOT_CHECK_CTES + """,
+                inserted AS (
+                    INSERT INTO appointments_appointment 
+                    (doctor_id, clinic_id, patient_id, scheduled_time, status, notes, created_at)
+                    SELECT %(doctor_id)s::bigint, %(clinic_id)s::bigint, patient.id, %(scheduled_time)s, 'booked', %(notes)s, NOW()
+                    FROM patient, aligned
+                    WHERE NOT EXISTS (SELECT 1 FROM held)
+                    ON CONFLICT (doctor_id, clinic_id, scheduled_time)
+                        WHERE status IN ('booked', 'rescheduled')
+                        DO NOTHING
+                    RETURNING id
+                ),
+                released AS (
+                    DELETE FROM appointments_slothold h
+                    USING patient
+                    WHERE h.patient_id = patient.id
+                      AND h.doctor_id = %(doctor_id)s
+                      AND h.clinic_id = %(clinic_id)s
+                      AND h.scheduled_time = %(scheduled_time)s
+                      AND EXISTS (SELECT 1 FROM inserted)
+                )
+                SELECT
+                    """ + SLOT_CHECK_COLUMNS + """,
+                    (SELECT id FROM inserted) AS appointment_id
+            """, {
+                "user_id": user.id,
+                "doctor_id": doctor_id,
+                "clinic_id": clinic_id,
+                "slot_date": scheduled_time.date(),
+                "slot_time": scheduled_time.time(),
+                "scheduled_time": scheduled_time,
+                "notes": notes,
+            })
+
+            result = dictfetchone(cursor)
+
+        error = slot_check_error(result)
+        if error:
+            return error
+
+        if result['appointment_id'] is None:
+            return Response({"error": "This slot is already booked."}, status=409)
+
+        patient_id = result['patient_id']
+        appointment_id = result['appointment_id']
+        invalidate_slots(result['doctor_clinic_id'], scheduled_time.date())
+        refresh_next_free_slots([result['doctor_clinic_id']])
 
-            patient_row = cursor.fetchone()
-            if not patient_row:
-                return Response({"error": "User is not a patient."}, status=400)
+        return Response({
+            "message": "Appointment booked successfully.",
+            "appointment": {
+                "id": appointment_id,
+                "doctor": doctor_id,
+                "clinic": clinic_id,
+                "patient": patient_id,
+                "scheduled_time": scheduled_time.strftime("%Y-%m-%dT%H:%M"),
+                "status": "booked",
+                "notes": notes
+            }
+        }, status=201)
 
-            patient_id = patient_row[0]
 
-            cursor.execute("""
-                SELECT id FROM doctors_doctorclinic
-                WHERE doctor_id = %s AND clinic_id = %s
-            """, [doctor_id, clinic_id])
+class PatientBatchBookAppointmentView(APIView):
+    """
+    Book several appointments at once, e.g. a weekly series
 
-            dc_row = cursor.fetchone()
-            if not dc_row:
-                return Response({"error": "Doctor is not registered at this clinic."}, status=404)
+    POST body:
+    - appointments: list of {doctor_id, clinic_id, scheduled_time, notes}
+      with scheduled_time in YYYY-MM-DDTHH:MM (at most 50 entries)
 
-            doctor_clinic_id = dc_row[0]
+    Every slot is validated against availability, existing bookings and
+    other patients' holds in one query, then all appointments are inserted
+    with one statement in one transaction: either the whole batch is
+    booked or nothing is.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-            cursor.execute("""
-                SELECT start_time, end_time, slot_duration
-                FROM doctors_doctoravailability
-                WHERE doctor_clinic_id = %s 
-                  AND date = %s 
-                  AND is_available = TRUE
-            """, [doctor_clinic_id, scheduled_time.date()])
+    def post(self, request):
+        items = request.data.get("appointments")
+
+        if not isinstance(items, list) or not items:
+            return Response({"error": "appointments must be a non-empty list."}, status=400)
+
+        if len(items) > MAX_BATCH_BOOKING_SIZE:
+            return Response({
+                "error": f"A batch cannot contain more than {MAX_BATCH_BOOKING_SIZE} appointments."
+            }, status=400)
+
+        doctor_ids, clinic_ids, scheduled_times, notes = [], [], [], []
+        errors = []
+        seen = set()
+        now = datetime.now()
+
+        for index, item in enumerate(items):
+            try:
+                doctor_id = int(item["doctor_id"])
+                clinic_id = int(item["clinic_id"])
+                scheduled_time = datetime.strptime(item["scheduled_time"], "%Y-%m-%dT%H:%M")
+            except (KeyError, TypeError, ValueError):
+                errors.append({
+                    "index": index,
+                    "error": "doctor_id, clinic_id and scheduled_time (YYYY-MM-DDTHH:MM) are required."
+                })
+                continue
+
+            if scheduled_time < now:
+                errors.append({"index": index, "error": "Cannot book appointments in the past"})
+            elif (doctor_id, clinic_id, scheduled_time) in seen:
+                errors.append({"index": index, "error": "Duplicate slot in batch."})
+
+            seen.add((doctor_id, clinic_id, scheduled_time))
+            doctor_ids.append(doctor_id)
+            clinic_ids.append(clinic_id)
+            scheduled_times.append(scheduled_time)
+            notes.append(item.get("notes") or "")
+
+        if errors:
+            return Response({"error": "Invalid appointments in batch.", "errors": errors}, status=400)
+
+        params = {
+            "user_id": request.user.id,
+            "doctor_ids": doctor_ids,
+            "clinic_ids": clinic_ids,
+            "scheduled_times": scheduled_times,
+            "notes": notes,
+        }
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id FROM patients_patientprofile WHERE user_id = %(user_id)s
+                """, params)
 
-            availability = dictfetchone(cursor)
-            if not availability:
-                return Response({"error": "Doctor is not available on this date."}, status=400)
+                patient_row = cursor.fetchone()
+                if not patient_row:
+                    return Response({"error": "User is not a patient."}, status=400)
 
-            start_dt = datetime.combine(scheduled_time.date(), availability['start_time'])
-            end_dt = datetime.combine(scheduled_time.date(), availability['end_time'])
+                params["patient_id"] = patient_row[0]
 
-            if not (start_dt <= scheduled_time < end_dt):
-                return Response({"error": "Scheduled time is outside doctor's availability window."}, status=400)
+                cursor.execute("""
+                    WITH requested AS (
+                        SELECT *
+                        FROM unnest(%(doctor_ids)s::bigint[], %(clinic_ids)s::bigint[], %(scheduled_times)s::timestamp[])
+                            WITH ORDINALITY AS r(doctor_id, clinic_id, scheduled_time, position)
+                    )
+                    SELECT
+                        r.position - 1 AS index,
+                        dc.id AS doctor_clinic_id,
+                        EXISTS (
+                            SELECT 1 FROM doctors_doctoravailability da
+                            WHERE da.doctor_clinic_id = dc.id
+                              AND da.date = r.scheduled_time::date
+                              AND da.is_available = TRUE
+                              AND da.start_time <= r.scheduled_time::time
+                              AND da.end_time > r.scheduled_time::time
+                              AND MOD(EXTRACT(EPOCH FROM (r.scheduled_time::time - da.start_time))::int / 60, da.slot_duration) = 0
+                        ) AS is_available,
+                        EXISTS (
+                            SELECT 1 FROM appointments_appointment a
+                            WHERE a.doctor_id = r.doctor_id
+                              AND a.clinic_id = r.clinic_id
+                              AND a.scheduled_time = r.scheduled_time
+                              AND a.status IN ('booked', 'rescheduled')
+                        ) AS is_booked,
+                        EXISTS (
+                            SELECT 1 FROM appointments_slothold h
+                            WHERE h.doctor_id = r.doctor_id
+                              AND h.clinic_id = r.clinic_id
+                              AND h.scheduled_time = r.scheduled_time
+                              AND h.expires_at > NOW()
+                              AND h.patient_id <> %(patient_id)s
+                        ) AS is_held
+                    FROM requested r
+                    LEFT JOIN doctors_doctorclinic dc
+                        ON dc.doctor_id = r.doctor_id AND dc.clinic_id = r.clinic_id
+                    ORDER BY r.position
+                """, params)
+
+                checks = dictfetchall(cursor)
+
+                # Invalid requests are 400; a batch that only lost slots to others is 409
+                status_code = 409
+                for check in checks:
+                    if check['doctor_clinic_id'] is None:
+                        status_code = 400
+                        errors.append({"index": check['index'], "error": "Doctor is not registered at this clinic."})
+                    elif not check['is_available']:
+                        status_code = 400
+                        errors.append({"index": check['index'], "error": "Doctor is not available at this time."})
+                    elif check['is_booked']:
+                        errors.append({"index": check['index'], "error": "This slot is already booked."})
+                    elif check['is_held']:
+                        errors.append({"index": check['index'], "error": "This slot is currently held by another patient."})
+
+                if errors:
+                    return Response({"error": "No appointments were booked.", "errors": errors}, status=status_code)
 
-            diff_minutes = int((scheduled_time - start_dt).total_seconds() / 60)
-            if diff_minutes % availability['slot_duration'] != 0:
-                return Response({"error": "Scheduled time does not align with slot duration."}, status=400)
+                cursor.execute("""
+                    WITH inserted AS (
+                        INSERT INTO appointments_appointment 
+                        (doctor_id, clinic_id, patient_id, scheduled_time, status, notes, created_at)
+                        SELECT doctor_id, clinic_id, %(patient_id)s, scheduled_time, 'booked', notes, NOW()
+                        FROM unnest(%(doctor_ids)s::bigint[], %(clinic_ids)s::bigint[], %(scheduled_times)s::timestamp[], %(notes)s::text[])
+                            AS r(doctor_id, clinic_id, scheduled_time, notes)
+                        RETURNING id, doctor_id, clinic_id, scheduled_time, notes
+                    ),
+                    released AS (
+                        DELETE FROM appointments_slothold h
+                        USING inserted i
+                        WHERE h.patient_id = %(patient_id)s
+                          AND h.doctor_id = i.doctor_id
+                          AND h.clinic_id = i.clinic_id
+                          AND h.scheduled_time = i.scheduled_time
+                    )
+                    SELECT id, doctor_id, clinic_id, scheduled_time, notes
+                    FROM inserted
+                    ORDER BY scheduled_time
+                """, params)
+
+                booked = dictfetchall(cursor)
+        except IntegrityError:
+            # Another request took one of the slots between validation and insert
+            return Response({
+                "error": "One or more slots were booked by someone else. No appointments were booked."
+            }, status=409)
+
+        days_by_clinic = {}
+        for check, scheduled_time in zip(checks, scheduled_times):
+            days_by_clinic.setdefault(check['doctor_clinic_id'], set()).add(scheduled_time.date())
+        for doctor_clinic_id, days in days_by_clinic.items():
+            invalidate_slot_days(doctor_clinic_id, days)
+        refresh_next_free_slots(list(days_by_clinic))
 
-            cursor.execute("""
-                SELECT id FROM appointments_appointment
-                WHERE doctor_id = %s 
-                  AND clinic_id = %s 
-                  AND scheduled_time = %s
-                  AND status IN ('booked', 'rescheduled')
-            """, [doctor_id, clinic_id, scheduled_time])
+        return Response({
+            "message": f"{len(booked)} appointment(s) booked successfully.",
+            "appointments": [
+                {
+                    "id": row['id'],
+                    "doctor": row['doctor_id'],
+                    "clinic": row['clinic_id'],
+                    "patient": params["patient_id"],
+                    "scheduled_time": row['scheduled_time'].strftime("%Y-%m-%dT%H:%M"),
+                    "status": "booked",
+                    "notes": row['notes']
+                }
+                for row in booked
+            ]
+        }, status=201)
 
-            if cursor.fetchone():
-                return Response({"error": "This slot is already booked."}, status=409)
 
-            cursor.execute("""
-                INSERT INTO appointments_appointment 
-                (doctor_id, clinic_id, patient_id, scheduled_time, status, notes, created_at)
-                VALUES (%s, %s, %s, %s, 'booked', %s, NOW())
-                RETURNING id
-            """, [doctor_id, clinic_id, patient_id, scheduled_time, notes])
+class PatientSlotHoldView(APIView):
+    """
+    POST: Hold a free slot for a few minutes while the patient completes booking
+    DELETE: Release one of the patient's holds
+
+    Held slots are hidden from other patients' availability listings and
+    cannot be booked by them until the hold expires. Expired holds are
+    removed in bulk by the reap_slot_holds command. A patient holds at most
+    SLOT_HOLD_MAX_ACTIVE_PER_PATIENT slots at once, and renewals stop
+    SLOT_HOLD_MAX_TOTAL_MINUTES after a hold was first taken.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        doctor_id = request.data.get("doctor_id")
+        clinic_id = request.data.get("clinic_id")
+        scheduled_time_str = request.data.get("scheduled_time")
 
-            appointment_id = cursor.fetchone()[0]
+        if not (doctor_id and clinic_id and scheduled_time_str):
+            return Response({"error": "Missing parameters."}, status=400)
+
+        try:
+            scheduled_time = datetime.strptime(scheduled_time_str, "%Y-%m-%dT%H:%M")
+        except ValueError:
+            return Response({"error": "scheduled_time must be in YYYY-MM-DDTHH:MM format."}, status=400)
+
+        if scheduled_time < datetime.now():
+            return Response({"error": "Cannot hold appointments in the past"}, status=400)
+
+        ttl_minutes = getattr(settings, "SLOT_HOLD_TTL_MINUTES", 5)
+        max_active = getattr(settings, "SLOT_HOLD_MAX_ACTIVE_PER_PATIENT", 3)
+        max_total_minutes = getattr(settings, "SLOT_HOLD_MAX_TOTAL_MINUTES", 15)
+
+        # An existing hold on the slot is taken over only if it has expired
+        # or already belongs to this patient (which extends it, but never past
+        # max_total_minutes after it was first taken). A patient may hold at
+        # most max_active slots at a time.
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Serialize one patient's hold requests so the active-hold count
+            # below (read with this statement's fresh snapshot) stays exact
+            cursor.execute(
+                "SELECT id FROM patients_patientprofile WHERE user_id = %s FOR UPDATE", [request.user.id]
+            )
+
+            cursor.execute("WITH " + SLOT_CHECK_CTES + """,
+                booked AS (
+                    SELECT 1 FROM appointments_appointment
+                    WHERE doctor_id = %(doctor_id)s
+                      AND clinic_id = %(clinic_id)s
+                      AND scheduled_time = %(scheduled_time)s
+                      AND status IN ('booked', 'rescheduled')
+                ),
+                own_hold AS (
+                    SELECT h.created_at
+                    FROM appointments_slothold h, patient
+                    WHERE h.doctor_id = %(doctor_id)s
+                      AND h.clinic_id = %(clinic_id)s
+                      AND h.scheduled_time = %(scheduled_time)s
+                      AND h.expires_at > NOW()
+                      AND h.patient_id = patient.id
+                ),
+                other_active_holds AS (
+                    SELECT COUNT(*) AS n
+                    FROM appointments_slothold h, patient
+                    WHERE h.patient_id = patient.id
+                      AND h.expires_at > NOW()
+                      AND NOT (h.doctor_id = %(doctor_id)s
+                               AND h.clinic_id = %(clinic_id)s
+                               AND h.scheduled_time = %(scheduled_time)s)
+                ),
+                upserted AS (
+                    INSERT INTO appointments_slothold 
+                    (doctor_id, clinic_id, patient_id, scheduled_time, expires_at, created_at)
+                    SELECT %(doctor_id)s::bigint, %(clinic_id)s::bigint, patient.id, %(scheduled_time)s,
+                           NOW() + make_interval(mins => %(ttl_minutes)s), NOW()
+                    FROM patient, aligned, other_active_holds
+                    WHERE NOT EXISTS (SELECT 1 FROM booked)
+                      AND other_active_holds.n < %(max_active)s
+                    ON CONFLICT (doctor_id, clinic_id, scheduled_time) DO UPDATE
+                    SET patient_id = EXCLUDED.patient_id,
+                        expires_at = CASE
+                            WHEN appointments_slothold.expires_at > NOW() THEN LEAST(
+                                EXCLUDED.expires_at,
+                                appointments_slothold.created_at + make_interval(mins => %(max_total_minutes)s)
+                            )
+                            ELSE EXCLUDED.expires_at
+                        END,
+                        created_at = CASE
+                            WHEN appointments_slothold.expires_at > NOW() THEN appointments_slothold.created_at
+                            ELSE EXCLUDED.created_at
+                        END
+                    WHERE appointments_slothold.expires_at <= NOW()
+                       OR (appointments_slothold.patient_id = EXCLUDED.patient_id
+                           AND appointments_slothold.created_at
+                               + make_interval(mins => %(max_total_minutes)s) > NOW())
+                    RETURNING id, expires_at
+                )
+                SELECT
+                    """ + SLOT_CHECK_COLUMNS + """,
+                    EXISTS (SELECT 1 FROM booked) AS is_booked,
+                    (SELECT n FROM other_active_holds) >= %(max_active)s AS hold_limit_reached,
+                    EXISTS (SELECT 1 FROM own_hold) AS is_renewal,
+                    (SELECT id FROM upserted) AS hold_id,
+                    (SELECT expires_at FROM upserted) AS expires_at
+            """, {
+                "user_id": request.user.id,
+                "doctor_id": doctor_id,
+                "clinic_id": clinic_id,
+                "slot_date": scheduled_time.date(),
+                "slot_time": scheduled_time.time(),
+                "scheduled_time": scheduled_time,
+                "ttl_minutes": ttl_minutes,
+                "max_active": max_active,
+                "max_total_minutes": max_total_minutes,
+            })
+
+            result = dictfetchone(cursor)
+
+        error = slot_check_error(result)
+        if error:
+            return error
+
+        if result['is_booked']:
+            return Response({"error": "This slot is already booked."}, status=409)
+
+        if result['hold_id'] is None and result['is_renewal']:
+            return Response({
+                "error": f"A hold cannot be extended beyond {max_total_minutes} minutes. Please book the slot."
+            }, status=409)
+
+        if result['hold_id'] is None and result['hold_limit_reached'] and not result['is_held']:
+            return Response({
+                "error": f"You can hold at most {max_active} slots at a time. Book or release one first."
+            }, status=429)
+
+        if result['hold_id'] is None:
+            return Response({"error": "This slot is currently held by another patient."}, status=409)
+
+        refresh_next_free_slots([result['doctor_clinic_id']])
+
+        # The slot reappears for other patients when the hold expires (renewals may be capped short of the TTL)
+        bump_version(
+            "availability", result['doctor_clinic_id'], scheduled_time.date(),
+            expires_in=max((result['expires_at'] - timezone.now()).total_seconds(), 1)
+        )
 
         return Response({
-            "message": "Appointment booked successfully.",
-            "appointment": {
-                "id": appointment_id,
-                "doctor": doctor_id,
-                "clinic": clinic_id,
-                "patient": patient_id,
-                "scheduled_time": scheduled_time.strftime("%Y-%m-%dT%H:%M"),
-                "status": "booked",
-                "notes": notes
-            }
+            "message": "Slot held successfully.",
+            "hold_id": result['hold_id'],
+            "scheduled_time": scheduled_time.strftime("%Y-%m-%dT%H:%M"),
+            "expires_at": result['expires_at']
         }, status=201)
 
+    def delete(self, request, hold_id):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM appointments_slothold h
+                USING patients_patientprofile p, doctors_doctorclinic dc
+                WHERE h.id = %s
+                  AND h.patient_id = p.id
+                  AND p.user_id = %s
+                  AND dc.doctor_id = h.doctor_id
+                  AND dc.clinic_id = h.clinic_id
+                RETURNING dc.id, h.scheduled_time
+            """, [hold_id, request.user.id])
+
+            released = cursor.fetchone()
+            if released is None:
+                return Response({"error": "Hold not found or does not belong to you."}, status=404)
+
+        refresh_next_free_slots([released[0]])
+        bump_version("availability", released[0], released[1].date())
+        return Response({"message": "Hold released successfully."})
+
 
 class PatientMyAppointmentsView(APIView):
     """View all upcoming appointments for the patient"""
@@ -465,6 +1072,12 @@ class PatientMyAppointmentsView(APIView):
     def get(self, request):
         user = request.user
 
+        try:
+            page_size = get_page_size(request)
+            after = decode_cursor(request, (datetime, int))
+        except InvalidPageRequest as e:
+            return Response({"error": str(e)}, status=400)
+
         with connection.cursor() as cursor:
             cursor.execute("""
                 SELECT id FROM patients_patientprofile WHERE user_id = %s
@@ -476,6 +1089,14 @@ class PatientMyAppointmentsView(APIView):
 
             patient_id = patient_row[0]
 
+            # Keyset pagination: resume after the (scheduled_time, id) of the last row served
+            params = [patient_id]
+            keyset_sql = ""
+            if after:
+                keyset_sql = "AND (a.scheduled_time, a.id) > (%s, %s)"
+                params.extend(after)
+            params.append(fetch_limit(page_size))
+
             cursor.execute("""
                 SELECT 
                     a.id,
@@ -494,13 +1115,18 @@ class PatientMyAppointmentsView(APIView):
                 WHERE a.patient_id = %s
                   AND a.scheduled_time >= NOW()
                   AND a.status != 'cancelled'
-                ORDER BY a.scheduled_time ASC
-            """, [patient_id])
+                """ + keyset_sql + """
+                ORDER BY a.scheduled_time ASC, a.id ASC
+                LIMIT %s
+            """, params)
 
-            appointments = dictfetchall(cursor)
+            appointments, next_cursor = paginate(
+                dictfetchall(cursor), page_size,
+                lambda row: (row['scheduled_time'], row['id'])
+            )
 
         serializer = AppointmentSerializer(appointments, many=True)
-        return Response(serializer.data)
+        return paginated_response(serializer.data, next_cursor)
 
 
 class PatientPastAppointmentsView(APIView):
@@ -510,6 +1136,12 @@ class PatientPastAppointmentsView(APIView):
     def get(self, request):
         user = request.user
 
+        try:
+            page_size = get_page_size(request)
+            after = decode_cursor(request, (datetime, int))
+        except InvalidPageRequest as e:
+            return Response({"error": str(e)}, status=400)
+
         with connection.cursor() as cursor:
             cursor.execute("""
                 SELECT id FROM patients_patientprofile WHERE user_id = %s
@@ -521,6 +1153,15 @@ class PatientPastAppointmentsView(APIView):
 
             patient_id = patient_row[0]
 
+            # Keyset pagination: resume after the (scheduled_time, id) of the last row served
+            params = [patient_id]
+            keyset_sql = ""
+            if after:
+                # The plain range predicate lets Postgres prune newer monthly partitions
+                keyset_sql = "AND pa.scheduled_time <= %s AND (pa.scheduled_time, pa.id) < (%s, %s)"
+                params.extend([after[0]] + after)
+            params.append(fetch_limit(page_size))
+
             cursor.execute("""
                 SELECT 
                     pa.id,
@@ -538,13 +1179,18 @@ class PatientPastAppointmentsView(APIView):
                 INNER JOIN users_user u ON dp.user_id = u.id
                 INNER JOIN clinic_clinic c ON pa.clinic_id = c.id
                 WHERE pa.patient_id = %s
-                ORDER BY pa.scheduled_time DESC
-            """, [patient_id])
+                """ + keyset_sql + """
+                ORDER BY pa.scheduled_time DESC, pa.id DESC
+                LIMIT %s
+            """, params)
 
-            past_appointments = dictfetchall(cursor)
+            past_appointments, next_cursor = paginate(
+                dictfetchall(cursor), page_size,
+                lambda row: (row['scheduled_time'], row['id'])
+            )
 
         serializer = PastAppointmentSerializer(past_appointments, many=True)
-        return Response(serializer.data)
+        return paginated_response(serializer.data, next_cursor)
 
 
 class PatientCancelAppointmentView(APIView):
@@ -566,9 +1212,11 @@ class PatientCancelAppointmentView(APIView):
             patient_id = patient_row[0]
 
             cursor.execute("""
-                SELECT id, status, scheduled_time 
-                FROM appointments_appointment
-                WHERE id = %s AND patient_id = %s
+                SELECT a.id, a.status, a.scheduled_time, dc.id AS doctor_clinic_id
+                FROM appointments_appointment a
+                LEFT JOIN doctors_doctorclinic dc
+                    ON dc.doctor_id = a.doctor_id AND dc.clinic_id = a.clinic_id
+                WHERE a.id = %s AND a.patient_id = %s
             """, [appointment_id, patient_id])
 
             appointment = dictfetchone(cursor)
@@ -587,6 +1235,10 @@ class PatientCancelAppointmentView(APIView):
                 WHERE id = %s
             """, [appointment_id])
 
+            if appointment['doctor_clinic_id']:
+                invalidate_slots(appointment['doctor_clinic_id'], appointment['scheduled_time'].date())
+                refresh_next_free_slots([appointment['doctor_clinic_id']])
+
         return Response({
             "message": "Appointment cancelled successfully.",
             "appointment_id": appointment_id
@@ -601,8 +1253,21 @@ class PatientDoctorListView(APIView):
     - name: Search by doctor's first or last name (partial match, case-insensitive)
     - specialization: Filter by specialization (partial match, case-insensitive)
     - clinic_name: Filter by clinic name (partial match, case-insensitive)
+    - q: Fuzzy search over name, specialization and clinic name; typo-tolerant
+      and ranked by trigram similarity (best match first)
+    - page_size: Results per page (default API_PAGE_SIZE; without page_size
+      or cursor every match is returned)
+    - cursor: Value of the X-Next-Cursor header of the previous page
+    - count in the body is the total number of matches, not the page length
+
+    Without q, name, specialization, clinic_name or facets the list comes from
+    the worker's in-process doctor directory, with no query.
+    - facets: true to add per-specialization and per-clinic counts of all
+      doctors matching the filters
     
     Examples:
+    GET /api/patient/doctors/?q=cardiolgy
+    GET /api/patient/doctors/?specialization=cardio&facets=true
     GET /api/patient/doctors/?name=smith
     GET /api/patient/doctors/?specialization=cardio
     GET /api/patient/doctors/?clinic_name=City Hospital
@@ -615,23 +1280,98 @@ class PatientDoctorListView(APIView):
         name = request.query_params.get("name")
         specialization = request.query_params.get("specialization")
         clinic_name = request.query_params.get("clinic_name")
+        query = (request.query_params.get("q") or "").strip()
+        with_facets = (request.query_params.get("facets") or "").lower() in ["true", "1", "yes"]
+
+        # Cursor = sort key of the last doctor served: (score,) first_name, last_name, id
+        sort_key = ("score", "first_name", "last_name", "id") if query else ("first_name", "last_name", "id")
+        try:
+            page_size = get_page_size(request)
+            after = decode_cursor(request, (float, str, str, int) if query else (str, str, int))
+        except InvalidPageRequest as e:
+            return Response({"error": str(e)}, status=400)
+
+        if not (query or name or specialization or clinic_name or with_facets):
+            # The plain list comes from this worker's in-process directory
+            doctors, next_cursor, total = list_doctors(after, page_size)
+            facets = None
+        else:
+            # Filtering, ordering and the keyset all run in Postgres (trigram
+            # indexes, DB collation), so cursors match the order served
+            doctors, next_cursor, facets, total = self.search_database(
+                query, name, specialization, clinic_name, after, page_size, sort_key, with_facets
+            )
 
+        serializer = DoctorListSerializer(doctors, many=True)
+        data = {
+            "count": total,
+            "filters_applied": {
+                "q": query or None,
+                "name": name,
+                "specialization": specialization,
+                "clinic_name": clinic_name
+            },
+            "results": serializer.data
+        }
+        if facets is not None:
+            data["facets"] = facets
+        return paginated_response(data, next_cursor)
+
+    def search_database(self, query, name, specialization, clinic_name, after, page_size, sort_key, with_facets=False):
+        """Run the search in Postgres; returns (page, next cursor, facets or None, total matches)"""
         with connection.cursor() as cursor:
-            # Build dynamic SQL query
+            # Build dynamic SQL query; each doctor's clinics are nested as JSON
+            # in the same query so the search is one round trip at any size
+            params = []
+            score_sql = ""
+            if query:
+                score_sql = """
+                    GREATEST(
+                        word_similarity(%s, u.first_name || ' ' || u.last_name),
+                        word_similarity(%s, dp.specialization),
+                        COALESCE((
+                            SELECT MAX(word_similarity(%s, c.name))
+                            FROM doctors_doctorclinic dc
+                            INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
+                            WHERE dc.doctor_id = dp.id
+                        ), 0)
+                    )::float8 AS score,
+                """
+                params.extend([query, query, query])
+
             sql = """
-                SELECT DISTINCT
+                SELECT
+                    """ + score_sql + """
                     dp.id,
                     dp.user_id,
                     u.first_name,
                     u.last_name,
                     dp.specialization,
                     dp.qualification,
-                    dp.experience_years
+                    dp.experience_years,
+                    COALESCE(cl.clinics, '[]'::json) AS clinics
                 FROM doctors_doctorprofile dp
                 INNER JOIN users_user u ON dp.user_id = u.id
+                """ + DOCTOR_CLINICS_LATERAL_SQL + """
                 WHERE 1=1
             """
-            params = []
+
+            # Fuzzy search: the <% (word similarity) operator is served by the trigram GIN indexes
+            if query:
+                sql += """
+                    AND (
+                        %s <%% (u.first_name || ' ' || u.last_name)
+                        OR %s <%% dp.specialization
+                        OR EXISTS (
+                            SELECT 1
+                            FROM doctors_doctorclinic dc
+                            INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
+                            WHERE dc.doctor_id = dp.id
+                            AND %s <%% c.name
+                        )
+                    )
+                """
+                params.extend([query, query, query])
 
             # Filter by doctor name (first OR last name)
             if name:
@@ -657,34 +1397,53 @@ class PatientDoctorListView(APIView):
                 """
                 params.append(f"%{clinic_name}%")
 
-            # Order results by name
-            sql += " ORDER BY u.first_name, u.last_name"
+            facets = None
+            if with_facets:
+                # Both facets over the whole filtered set in one grouped query
+                cursor.execute(DOCTOR_FACETS_SQL.format(search_sql=sql), params)
+                facets = {"specializations": [], "clinics": []}
+                for by_clinic, value, clinic_id, facet_clinic_name, count in cursor.fetchall():
+                    if not by_clinic:
+                        facets["specializations"].append({"value": value, "count": count})
+                    elif clinic_id is not None:
+                        facets["clinics"].append({"clinic_id": clinic_id, "clinic_name": facet_clinic_name, "count": count})
+
+            # Keyset pagination over the computed columns, then order results
+            # by relevance for fuzzy search, otherwise by name. score is
+            # float8 so the cursor round-trips it exactly and ties still match.
+            # The window count runs before the keyset, so every page carries
+            # the total number of matches.
+            matches_sql, matches_params = sql, list(params)
+            sql = "SELECT * FROM (SELECT *, COUNT(*) OVER () AS total_count FROM (" + sql + ") matches) doctors"
+            if after and query:
+                sql += (
+                    " WHERE (score < %s::float8"
+                    " OR (score = %s::float8 AND (first_name, last_name, id) > (%s, %s, %s)))"
+                )
+                params.extend([after[0]] + after)
+            elif after:
+                sql += " WHERE (first_name, last_name, id) > (%s, %s, %s)"
+                params.extend(after)
+
+            if query:
+                sql += " ORDER BY score DESC, first_name, last_name, id"
+            else:
+                sql += " ORDER BY first_name, last_name, id"
+            sql += " LIMIT %s"
+            params.append(fetch_limit(page_size))
 
             cursor.execute(sql, params)
-            doctors = dictfetchall(cursor)
-
-            # For each doctor, get their associated clinics
-            for doctor in doctors:
-                cursor.execute("""
-                    SELECT 
-                        dc.clinic_id,
-                        c.name as clinic_name,
-                        dc.consultation_fee
-                    FROM doctors_doctorclinic dc
-                    INNER JOIN clinic_clinic c ON dc.clinic_id = c.id
-                    WHERE dc.doctor_id = %s
-                    ORDER BY c.name
-                """, [doctor['id']])
-                
-                doctor['clinics'] = dictfetchall(cursor)
-
-        serializer = DoctorListSerializer(doctors, many=True)
-        return Response({
-            "count": len(doctors),
-            "filters_applied": {
-                "name": name,
-                "specialization": specialization,
-                "clinic_name": clinic_name
-            },
-            "results": serializer.data
-        })
\ No newline at end of file
+            rows = dictfetchall(cursor)
+            if rows:
+                total = rows[0]['total_count']
+            elif after:
+                # A cursor past the last match: the page carries no count
+                cursor.execute("SELECT COUNT(*) FROM (" + matches_sql + ") matches", matches_params)
+                total = cursor.fetchone()[0]
+            else:
+                total = 0
+            doctors, next_cursor = paginate(
+                rows, page_size,
+                lambda row: [row[column] for column in sort_key]
+            )
+        return doctors, next_cursor, facets, total
\ No newline at end of file
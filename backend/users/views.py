@@ -6,6 +6,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.hashers import make_password, check_password
 from users.serializers import RegisterSerializer, LoginSerializer
+from doctors.directory import refresh_doctors
 
 
 def dictfetchone(cursor):
@@ -80,6 +81,8 @@ class RegisterView(APIView):
                             VALUES (%s, %s, NOW())
                         """, [doctor_id, clinic_id])
 
+                refresh_doctors([doctor_id])
+
             elif role == "patient":
                 phone = serializer.validated_data.get("phone", "")
                 date_of_birth = serializer.validated_data.get("date_of_birth")
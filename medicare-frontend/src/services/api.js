@@ -107,6 +107,12 @@ export const removeDoctorClinic = (clinicId) =>
 export const addDoctorAvailability = (availabilityData) =>
   handleResponse(apiClient.post('/api/doctors/add-availability/', availabilityData));
 
+export const getDoctorAvailabilityTemplates = () =>
+  handleResponse(apiClient.get('/api/doctors/availability-templates/'));
+
+export const addDoctorAvailabilityTemplate = (templateData) =>
+  handleResponse(apiClient.post('/api/doctors/availability-templates/', templateData));
+
 export const getDoctorAppointments = () =>
   handleResponse(apiClient.get('/api/doctors/my-appointments/'));
 
@@ -133,6 +139,9 @@ export const getDoctors = (filters = {}) => {
   return handleResponse(apiClient.get(url));
 };
 
+export const getClinics = () =>
+  handleResponse(apiClient.get('/api/clinics/'));
+
 export const getDoctorById = (doctorId) =>
   handleResponse(apiClient.get(`/api/patient/doctors/${doctorId}/`));
 
@@ -143,21 +152,43 @@ export const getDoctorSlots = (doctorId, clinicId, date) =>
     })
   );
 
+export const getDoctorSlotsRange = (doctorId, clinicId, startDate, endDate) =>
+  handleResponse(
+    apiClient.get('/api/patient/doctor-availability/range/', {
+      params: { doctor_id: doctorId, clinic_id: clinicId, start_date: startDate, end_date: endDate },
+    })
+  );
+
+export const getNextAvailable = (filters = {}) =>
+  handleResponse(apiClient.get('/api/patient/next-available/', { params: filters }));
+
 export const createAppointment = (appointmentData) =>
   handleResponse(apiClient.post('/api/patient/book-appointment/', appointmentData));
 
+export const createAppointmentsBatch = (appointments) =>
+  handleResponse(apiClient.post('/api/patient/book-appointments/batch/', { appointments }));
+
+export const holdSlot = (holdData) =>
+  handleResponse(apiClient.post('/api/patient/hold-slot/', holdData));
+
+export const releaseSlotHold = (holdId) =>
+  handleResponse(apiClient.delete(`/api/patient/hold-slot/${holdId}/`));
+
 export const getMyAppointments = () =>
   handleResponse(apiClient.get('/api/patient/my-appointments/'));
 
 export const getPastAppointments = () =>
   handleResponse(apiClient.get('/api/patient/past-appointments/'));
 
+export const getAppointmentTimeline = (filters = {}) =>
+  handleResponse(apiClient.get('/api/appointments/timeline/', { params: filters }));
+
 export const cancelAppointment = (appointmentId) =>
   handleResponse(apiClient.post(`/api/patient/cancel-appointment/${appointmentId}/`));
 
 // Notification APIs
 export const getNotifications = () =>
-  handleResponse(apiClient.get('/api/notifications/'));
+  handleResponse(apiClient.get('/api/notifications/feed/'));
 
 export const markNotificationRead = (notificationId) =>
   handleResponse(apiClient.post(`/api/notifications/${notificationId}/read/`));